@@ -4,8 +4,22 @@ import cProfile
 import json
 import random
 import string
-from prefix_trie import PrefixTrie
+import tempfile
+import threading
+import asyncio
+import os
+from prefix_trie import PrefixTrie, RadixTrie
 from suffix_array import InvertedSuffixArray
+from fm_index import FMIndex
+from sorted_word_array import SortedWordArray
+from durable_trie import DurableTrie
+from snapshot_index import SnapshotSuffixArray
+from query_server import QueryServer, run_load
+from sharded_index import ShardedIndex
+from query_cache import CachedIndex
+from bloom_filter import FilteredIndex
+from sa_construction import SA_ALGORITHMS, encode_words
+from parallel_build import parallel_suffix_array
 
 # Set seed for reproducibility
 random.seed(42)
@@ -51,11 +65,15 @@ class Benchmark:
             tracemalloc.stop()
 
 
-            self.results[name]["insert"].append({
+            entry = {
                 "size": size,
                 "time_sec": elapsed,
                 "peak_memory_bytes": peak
-            })
+            }
+            # Per-component byte breakdown of the built structure
+            if hasattr(structure, "memory_report"):
+                entry["memory_report"] = structure.memory_report()
+            self.results[name]["insert"].append(entry)
     # -------------------------------
     # Benchmark search
     # -------------------------------
@@ -90,6 +108,48 @@ class Benchmark:
             "peak_memory_bytes": peak
         })
 
+    # -------------------------------
+    # Benchmark batched search (search_many vs per-query loop)
+    # -------------------------------
+    def benchmark_search_many(self, structure_class, name, query_count=1000):
+        self.results[name]["search_many"] = []
+        size = self.dataset_sizes[-1]
+        words = read_words_from_file(f"datasets/{size}.txt")
+        structure = structure_class()
+        # Use batch insert if available
+        if hasattr(structure, 'insert_batch'):
+            structure.insert_batch(words)
+        else:
+            for w in words:
+                structure.insert(w)
+
+        # Half hits, half (almost surely absent) reversed words
+        queries = random.choices(words, k=query_count // 2)
+        queries += [w[::-1] for w in random.choices(words, k=query_count - len(queries))]
+
+        start_time = time.perf_counter()
+        for q in queries:
+            structure.search(q)
+        loop_elapsed = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        structure.search_many(queries)
+        elapsed = time.perf_counter() - start_time
+
+        # Memory is traced on a separate run so tracing doesn't skew timing
+        tracemalloc.start()
+        structure.search_many(queries)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        self.results[name]["search_many"].append({
+            "queries": query_count,
+            "avg_time_sec": elapsed / query_count,
+            "loop_avg_time_sec": loop_elapsed / query_count,
+            "speedup": loop_elapsed / elapsed,
+            "peak_memory_bytes": peak
+        })
+
     # -------------------------------
     # Benchmark range search
     # -------------------------------
@@ -123,6 +183,330 @@ class Benchmark:
             "peak_memory_bytes": peak
         })
 
+    # -------------------------------
+    # Benchmark range search with large result sets
+    # -------------------------------
+    def benchmark_range_search_large(self, structure_class, name, suffix_lengths=(0, 1)):
+        self.results[name]["range_search_large"] = []
+        size = self.dataset_sizes[-1]
+        words = read_words_from_file(f"datasets/{size}.txt")
+        structure = structure_class()
+        # Use batch insert if available
+        if hasattr(structure, 'insert_batch'):
+            structure.insert_batch(words)
+        else:
+            for w in words:
+                structure.insert(w)
+
+        # Short suffixes match thousands of words, so the per-result cost
+        # of collecting them dominates the lookup
+        for length in suffix_lengths:
+            suffixes = sorted({w[len(w) - length:] for w in words if len(w) >= length})
+
+            start_time = time.perf_counter()
+            result_count = sum(len(structure.range_search(q)) for q in suffixes)
+            elapsed = time.perf_counter() - start_time
+
+            self.results[name]["range_search_large"].append({
+                "suffix_length": length,
+                "queries": len(suffixes),
+                "results": result_count,
+                "avg_time_sec": elapsed / len(suffixes),
+                "per_result_time_sec": elapsed / max(result_count, 1)
+            })
+
+    # -------------------------------
+    # Benchmark trie bulk loading (insert_batch vs per-word insert)
+    # -------------------------------
+    def benchmark_bulk_load(self, sizes=("large", "xlarge")):
+        self.results["prefix_trie"]["bulk_load"] = []
+
+        for size in sizes:
+            words = read_words_from_file(f"datasets/{size}.txt")
+
+            for structure_class in (PrefixTrie, RadixTrie):
+                structure = structure_class()
+                start_time = time.perf_counter()
+                for w in words:
+                    structure.insert(w)
+                loop_elapsed = time.perf_counter() - start_time
+
+                timings = {}
+                for pause_gc in (False, True):
+                    structure = structure_class()
+                    start_time = time.perf_counter()
+                    structure.insert_batch(words, pause_gc=pause_gc)
+                    timings[pause_gc] = time.perf_counter() - start_time
+
+                self.results["prefix_trie"]["bulk_load"].append({
+                    "size": size,
+                    "structure": structure_class.__name__,
+                    "loop_time_sec": loop_elapsed,
+                    "batch_time_sec": timings[True],
+                    "batch_gc_enabled_time_sec": timings[False],
+                    "speedup": loop_elapsed / timings[True]
+                })
+
+    # -------------------------------
+    # Benchmark trie restart: snapshot + log recovery vs full replay
+    # -------------------------------
+    def benchmark_recovery(self, tail_count=1000):
+        self.results["prefix_trie"]["recovery"] = []
+
+        for size in self.dataset_sizes:
+            words = read_words_from_file(f"datasets/{size}.txt")
+
+            start_time = time.perf_counter()
+            structure = PrefixTrie()
+            for w in words:
+                structure.insert(w)
+            replay_elapsed = time.perf_counter() - start_time
+
+            with tempfile.TemporaryDirectory() as path:
+                # Snapshot of all words, plus a log tail of recent inserts
+                with DurableTrie(path) as durable:
+                    durable.insert_batch(words)
+                    durable.compact()
+                    for w in random.choices(words, k=tail_count):
+                        durable.insert(w[::-1])
+
+                start_time = time.perf_counter()
+                durable = DurableTrie(path)
+                recovery_elapsed = time.perf_counter() - start_time
+                durable.close()
+
+            self.results["prefix_trie"]["recovery"].append({
+                "size": size,
+                "log_tail_records": tail_count,
+                "replay_time_sec": replay_elapsed,
+                "recovery_time_sec": recovery_elapsed
+            })
+
+    # -------------------------------
+    # Benchmark reads during rebuilds: one lock vs snapshot swapping
+    # -------------------------------
+    def benchmark_snapshot_reads(self, rebuilds=5, pattern="ing"):
+        self.results["suffix_array"]["snapshot_reads"] = []
+        words = read_words_from_file(f"datasets/{self.dataset_sizes[-1]}.txt")
+        base, batches = words[:len(words) // 2], words[len(words) // 2:]
+        step = len(batches) // rebuilds
+
+        for mode in ("locked", "snapshot"):
+            if mode == "locked":
+                structure = InvertedSuffixArray()
+                structure.insert_batch(base)
+                lock = threading.Lock()
+
+                def read():
+                    with lock:
+                        structure.range_search(pattern)
+
+                def write(batch):
+                    with lock:
+                        structure.insert_batch(batch)
+            else:
+                structure = SnapshotSuffixArray()
+                structure.insert_batch(base)
+                structure.flush()
+
+                def read():
+                    structure.range_search(pattern)
+
+                def write(batch):
+                    structure.insert_batch(batch)
+                    structure.flush()
+
+            latencies = []
+            done = threading.Event()
+
+            def reader():
+                while not done.is_set():
+                    start_time = time.perf_counter()
+                    read()
+                    latencies.append(time.perf_counter() - start_time)
+
+            thread = threading.Thread(target=reader)
+            thread.start()
+            start_time = time.perf_counter()
+            for i in range(rebuilds):
+                write(batches[i * step:(i + 1) * step])
+            elapsed = time.perf_counter() - start_time
+            done.set()
+            thread.join()
+            if mode == "snapshot":
+                structure.close()
+
+            latencies.sort()
+            self.results["suffix_array"]["snapshot_reads"].append({
+                "mode": mode,
+                "rebuilds": rebuilds,
+                "write_time_sec": elapsed,
+                "reads": len(latencies),
+                "read_p50_sec": latencies[len(latencies) // 2],
+                "read_p99_sec": latencies[int(len(latencies) * 0.99)],
+                "read_max_sec": latencies[-1]
+            })
+
+    # -------------------------------
+    # Benchmark the query server: one request per batch vs micro-batches
+    # -------------------------------
+    def benchmark_query_server(self, connections=32, requests=5000, batch_window=0.001):
+        self.results["suffix_array"]["query_server"] = []
+        words = read_words_from_file(f"datasets/{self.dataset_sizes[-1]}.txt")
+        structure = InvertedSuffixArray()
+        structure.insert_batch(words)
+        # Suffixes of random words, so every query has matches
+        patterns = [w[-random.randint(1, len(w)):] for w in random.choices(words, k=1000)]
+
+        for window, max_batch in ((0, 1), (batch_window, 256)):
+            server = QueryServer(structure, batch_window=window, max_batch=max_batch)
+            host, port = server.start_in_thread()
+            for op in ("search", "range_search"):
+                report = asyncio.run(run_load(
+                    patterns, host, port, op=op,
+                    connections=connections, requests=requests,
+                ))
+                report["batch_window_sec"] = window
+                report["max_batch"] = max_batch
+                self.results["suffix_array"]["query_server"].append(report)
+            server.stop_thread()
+
+    # -------------------------------
+    # Benchmark sharded multi-process index throughput
+    # -------------------------------
+    def benchmark_sharded(self, shard_counts=(1, 2, 4), partition="suffix"):
+        self.results["suffix_array"]["sharded"] = []
+        words = read_words_from_file(f"datasets/{self.dataset_sizes[-1]}.txt")
+        patterns = [w[-random.randint(1, len(w)):] for w in random.choices(words, k=2000)]
+
+        for shards in shard_counts:
+            with ShardedIndex(shards, partition=partition) as structure:
+                start_time = time.perf_counter()
+                structure.insert_batch(words)
+                build_elapsed = time.perf_counter() - start_time
+
+                start_time = time.perf_counter()
+                structure.search_many(words)
+                search_elapsed = time.perf_counter() - start_time
+
+                start_time = time.perf_counter()
+                structure.range_search_many(patterns)
+                range_elapsed = time.perf_counter() - start_time
+
+            self.results["suffix_array"]["sharded"].append({
+                "shards": shards,
+                "partition": partition,
+                "cpu_count": os.cpu_count(),
+                "build_time_sec": build_elapsed,
+                "search_qps": len(words) / search_elapsed,
+                "range_search_qps": len(patterns) / range_elapsed
+            })
+
+    # -------------------------------
+    # Benchmark the LRU query cache on a skewed suffix workload
+    # -------------------------------
+    def benchmark_query_cache(self, queries=5000, distinct=300, max_entries=128, structures=None):
+        structures = structures or {"prefix_trie": PrefixTrie,
+                                    "suffix_array": InvertedSuffixArray}
+        for name in structures:
+            self.results.setdefault(name, {})["query_cache"] = []
+        words = read_words_from_file(f"datasets/{self.dataset_sizes[-1]}.txt")
+        suffixes = list({w[-random.randint(1, 3):] for w in random.choices(words, k=distinct)})
+        # Zipf-like skew: the i-th suffix is drawn with weight 1 / (i + 1)
+        weights = [1 / (i + 1) for i in range(len(suffixes))]
+        workload = random.choices(suffixes, weights=weights, k=queries)
+
+        for name, structure_class in structures.items():
+            structure = structure_class()
+            structure.insert_batch(words)
+            cached = CachedIndex(structure, max_entries=max_entries)
+
+            timings = {}
+            for label, target in (("uncached", structure), ("cached", cached)):
+                start_time = time.perf_counter()
+                for suffix in workload:
+                    target.range_search(suffix)
+                timings[label] = time.perf_counter() - start_time
+
+            self.results[name]["query_cache"].append({
+                "queries": queries,
+                "uncached_time_sec": timings["uncached"],
+                "cached_time_sec": timings["cached"],
+                "cache": cached.stats()
+            })
+
+    # -------------------------------
+    # Benchmark the Bloom filter front-end on mostly-absent searches
+    # -------------------------------
+    def benchmark_membership_filter(self, queries=20000, absent_ratio=0.6, fp_rate=0.01,
+                                    structures=None):
+        structures = structures or {"prefix_trie": PrefixTrie,
+                                    "suffix_array": InvertedSuffixArray}
+        for name in structures:
+            self.results.setdefault(name, {})["membership_filter"] = []
+        words = read_words_from_file(f"datasets/{self.dataset_sizes[-1]}.txt")
+        present = set(words)
+        absent = []
+        while len(absent) < int(queries * absent_ratio):
+            word = ''.join(random.choices(string.ascii_lowercase, k=random.randint(4, 12)))
+            if word not in present:
+                absent.append(word)
+        workload = absent + random.choices(words, k=queries - len(absent))
+        random.shuffle(workload)
+
+        for name, structure_class in structures.items():
+            structure = structure_class()
+            structure.insert_batch(words)
+            filtered = FilteredIndex(structure, fp_rate=fp_rate)
+
+            timings = {}
+            for label, target in (("unfiltered", structure), ("filtered", filtered)):
+                start_time = time.perf_counter()
+                for word in workload:
+                    target.search(word)
+                timings[label] = time.perf_counter() - start_time
+
+            self.results[name]["membership_filter"].append({
+                "queries": queries,
+                "absent_ratio": absent_ratio,
+                "unfiltered_time_sec": timings["unfiltered"],
+                "filtered_time_sec": timings["filtered"],
+                "filter": filtered.stats()
+            })
+
+    # -------------------------------
+    # Benchmark subtree-count augmentation (counted tries)
+    # -------------------------------
+    def benchmark_subtree_counts(self, page_size=10):
+        self.results["prefix_trie"]["subtree_counts"] = []
+        size = self.dataset_sizes[-1]
+        words = read_words_from_file(f"datasets/{size}.txt")
+
+        for structure_class in (PrefixTrie, RadixTrie):
+            for counted in (False, True):
+                structure = structure_class(counted=counted)
+                start_time = time.perf_counter()
+                for w in words:
+                    structure.insert(w)
+                insert_elapsed = time.perf_counter() - start_time
+
+                start_time = time.perf_counter()
+                total = structure.count_suffix("")
+                count_elapsed = time.perf_counter() - start_time
+
+                # A page from the middle of all words
+                start_time = time.perf_counter()
+                structure.range_search("", limit=page_size, offset=total // 2)
+                page_elapsed = time.perf_counter() - start_time
+
+                self.results["prefix_trie"]["subtree_counts"].append({
+                    "structure": structure_class.__name__,
+                    "counted": counted,
+                    "insert_time_sec": insert_elapsed,
+                    "count_suffix_time_sec": count_elapsed,
+                    "middle_page_time_sec": page_elapsed
+                })
+
     # -------------------------------
     # Benchmark delete
     # -------------------------------
@@ -157,11 +541,131 @@ class Benchmark:
             "peak_memory_bytes": peak
         })
 
+    # -------------------------------
+    # Benchmark suffix array construction algorithms
+    # -------------------------------
+    def benchmark_sa_construction(self, algorithms=None):
+        algorithms = algorithms or sorted(SA_ALGORITHMS)
+        self.results["suffix_array"]["construction"] = []
+
+        for size in self.dataset_sizes:
+            words = read_words_from_file(f"datasets/{size}.txt")
+
+            for algorithm in algorithms:
+                structure = InvertedSuffixArray(algorithm=algorithm)
+
+                tracemalloc.start()
+                start_time = time.perf_counter()
+
+                structure.insert_batch(words)
+
+                elapsed = time.perf_counter() - start_time
+                current, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+                self.results["suffix_array"]["construction"].append({
+                    "size": size,
+                    "algorithm": algorithm,
+                    "time_sec": elapsed,
+                    "peak_memory_bytes": peak
+                })
+
+    # -------------------------------
+    # Benchmark parallel suffix array construction
+    # -------------------------------
+    def benchmark_parallel_build(self, worker_counts=(1, 2, 4, 8)):
+        self.results["suffix_array"]["parallel_build"] = []
+        size = self.dataset_sizes[-1]
+        words = read_words_from_file(f"datasets/{size}.txt")
+        codes, word_starts, _ = encode_words(list(dict.fromkeys(w[::-1] for w in words)))
+        baseline = None
+
+        # The bucket sort at every worker count, so the speedup is from
+        # the extra cores alone (workers=1 is the baseline, not doubling)
+        for workers in worker_counts:
+            start_time = time.perf_counter()
+            parallel_suffix_array(codes, word_starts, workers)
+            elapsed = time.perf_counter() - start_time
+
+            if baseline is None:
+                baseline = elapsed
+            self.results["suffix_array"]["parallel_build"].append({
+                "size": size,
+                "workers": workers,
+                "time_sec": elapsed,
+                "speedup": baseline / elapsed
+            })
+
+    # -------------------------------
+    # Benchmark index footprint (suffix array vs FM-index)
+    # -------------------------------
+    def benchmark_index_memory(self, structures=None):
+        structures = structures or {"suffix_array": InvertedSuffixArray,
+                                    "fm_index": FMIndex}
+        for name in structures:
+            self.results.setdefault(name, {})["index_memory"] = []
+
+        for size in self.dataset_sizes:
+            words = read_words_from_file(f"datasets/{size}.txt")
+
+            for name, structure_class in structures.items():
+                structure = structure_class()
+                structure.insert_batch(words)
+
+                self.results[name]["index_memory"].append({
+                    "size": size,
+                    "words": len(words),
+                    "memory_bytes": structure.memory_usage()
+                })
+
+    # -------------------------------
+    # Benchmark frozen (array-backed) trie vs dict trie
+    # -------------------------------
+    def benchmark_frozen_trie(self, query_count=1000):
+        self.results["prefix_trie"]["frozen"] = []
+
+        for size in self.dataset_sizes:
+            words = read_words_from_file(f"datasets/{size}.txt")
+
+            tracemalloc.start()
+            trie = PrefixTrie()
+            for w in words:
+                trie.insert(w)
+            trie_memory, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            start_time = time.perf_counter()
+            frozen = trie.freeze()
+            freeze_elapsed = time.perf_counter() - start_time
+
+            queries = random.choices(words, k=query_count)
+            entry = {
+                "size": size,
+                "freeze_time_sec": freeze_elapsed,
+                "trie_memory_bytes": trie_memory,
+                "frozen_memory_bytes": frozen.memory_usage()
+            }
+            for label, structure in (("trie", trie), ("frozen", frozen)):
+                start_time = time.perf_counter()
+                for q in queries:
+                    structure.search(q)
+                entry[f"{label}_search_avg_time_sec"] = \
+                    (time.perf_counter() - start_time) / query_count
+
+                start_time = time.perf_counter()
+                for q in queries:
+                    structure.range_search(q[-3:])
+                entry[f"{label}_range_search_avg_time_sec"] = \
+                    (time.perf_counter() - start_time) / query_count
+
+            self.results["prefix_trie"]["frozen"].append(entry)
+
     # -------------------------------
     # Run all benchmarks for a structure
     # -------------------------------
     def run_all(self, structure_class, name):
         print(f"Running benchmarks for {name}...")
+        self.results.setdefault(name, {})
         profiler = cProfile.Profile()
         profiler.enable()
 
@@ -169,8 +673,12 @@ class Benchmark:
         print(f"Completed insert benchmark for {name}.")
         self.benchmark_search(structure_class, name)
         print(f"Completed search benchmark for {name}.")
+        self.benchmark_search_many(structure_class, name)
+        print(f"Completed batched search benchmark for {name}.")
         self.benchmark_range_search(structure_class, name)
         print(f"Completed range search benchmark for {name}.")
+        self.benchmark_range_search_large(structure_class, name)
+        print(f"Completed large range search benchmark for {name}.")
         self.benchmark_delete(structure_class, name)
         print(f"Completed delete benchmark for {name}.")
         profiler.disable()
@@ -193,9 +701,54 @@ if __name__ == "__main__":
     # Run benchmarks for PrefixTrie
     benchmark.run_all(PrefixTrie, "prefix_trie")
 
+    # Run benchmarks for the path-compressed RadixTrie
+    benchmark.run_all(RadixTrie, "radix_trie")
+
     # Run benchmarks for InvertedSuffixArray
     benchmark.run_all(InvertedSuffixArray, "suffix_array")
 
+    # Run benchmarks for the compressed FMIndex
+    benchmark.run_all(FMIndex, "fm_index")
+
+    # Run benchmarks for the front-coded SortedWordArray
+    benchmark.run_all(SortedWordArray, "sorted_array")
+
+    # Compare suffix array and FM-index footprints
+    benchmark.benchmark_index_memory()
+
+    # Compare the frozen array trie with the dict trie
+    benchmark.benchmark_frozen_trie()
+
+    # Compare trie bulk loading with per-word inserts
+    benchmark.benchmark_bulk_load()
+
+    # Measure subtree-count augmented tries
+    benchmark.benchmark_subtree_counts()
+
+    # Compare snapshot + log recovery with a full replay
+    benchmark.benchmark_recovery()
+
+    # Compare locked reads with snapshot swapping during rebuilds
+    benchmark.benchmark_snapshot_reads()
+
+    # Measure query server latency and QPS with and without coalescing
+    benchmark.benchmark_query_server()
+
+    # Measure sharded index throughput across processes
+    benchmark.benchmark_sharded()
+
+    # Measure the LRU query cache on a skewed workload
+    benchmark.benchmark_query_cache()
+
+    # Measure the Bloom filter front-end on mostly-absent searches
+    benchmark.benchmark_membership_filter()
+
+    # Compare suffix array construction algorithms
+    benchmark.benchmark_sa_construction()
+
+    # Measure multi-core suffix array construction
+    benchmark.benchmark_parallel_build()
+
     # Save results to JSON
     benchmark.save_results()
     print("Benchmarking complete. Results saved to benchmark_results.json")
@@ -0,0 +1,199 @@
+import math
+
+_MASK32 = 0xFFFFFFFF
+
+
+class BloomFilter:
+    """
+    Bloom filter over words, sized for capacity items at fp_rate.
+
+    Positions come from double hashing of the word's built-in hash (so
+    a filter is only meaningful inside the process that built it). With
+    counting=True every cell is a saturating 8-bit counter and remove()
+    is supported; otherwise cells are single bits and the filter has to
+    be rebuilt to forget words.
+    """
+
+    def __init__(self, capacity: int, fp_rate: float = 0.01, counting: bool = True):
+        if not 0 < fp_rate < 1:
+            raise ValueError(f"fp_rate must be in (0, 1), got {fp_rate}")
+        capacity = max(capacity, 1)
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.counting = counting
+        self.size = max(8, math.ceil(-capacity * math.log(fp_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.cells = bytearray(self.size if counting else (self.size + 7) // 8)
+        self.items = 0
+
+    def _positions(self, word: str):
+        h = hash(word)
+        h1 = h & _MASK32
+        h2 = ((h >> 32) & _MASK32) | 1
+        size = self.size
+        return [(h1 + i * h2) % size for i in range(self.hashes)]
+
+    def add(self, word: str) -> None:
+        cells = self.cells
+        if self.counting:
+            for p in self._positions(word):
+                if cells[p] < 255:
+                    cells[p] += 1
+        else:
+            for p in self._positions(word):
+                cells[p >> 3] |= 1 << (p & 7)
+        self.items += 1
+
+    def remove(self, word: str) -> None:
+        """Forget a word that was added (counting filters only)."""
+        if not self.counting:
+            raise ValueError("remove() needs a counting filter")
+        cells = self.cells
+        for p in self._positions(word):
+            # Saturated counters have lost track and are left alone
+            if 0 < cells[p] < 255:
+                cells[p] -= 1
+        self.items -= 1
+
+    def __contains__(self, word: str) -> bool:
+        # _positions inlined: most absent words stop at the first probe
+        h = hash(word)
+        p = h & _MASK32
+        step = ((h >> 32) & _MASK32) | 1
+        size = self.size
+        cells = self.cells
+        if self.counting:
+            for _ in range(self.hashes):
+                if not cells[p % size]:
+                    return False
+                p += step
+        else:
+            for _ in range(self.hashes):
+                q = p % size
+                if not cells[q >> 3] & (1 << (q & 7)):
+                    return False
+                p += step
+        return True
+
+    def expected_fp_rate(self) -> float:
+        """(1 - e^(-kn/m))^k for the current item count."""
+        return (1 - math.exp(-self.hashes * self.items / self.size)) ** self.hashes
+
+    def memory_usage(self) -> int:
+        return len(self.cells)
+
+
+class FilteredIndex:
+    """
+    Bloom filter in front of any index structure's search(): absent words
+    are usually rejected after a few hash probes, without touching the
+    structure. Words the filter lets through are confirmed by the
+    structure, so results are exact.
+
+    The filter is sized for twice the current word count and rebuilt from
+    the structure once it fills up. Deletes use counting semantics
+    (counting=True) or mark the filter stale and rebuild it after
+    rebuild_ratio of its words are gone.
+    """
+
+    def __init__(
+        self,
+        structure,
+        fp_rate: float = 0.01,
+        counting: bool = True,
+        rebuild_ratio: float = 0.2,
+        min_capacity: int = 1024,
+    ):
+        self.structure = structure
+        self.fp_rate = fp_rate
+        self.counting = counting
+        self.rebuild_ratio = rebuild_ratio
+        self.min_capacity = min_capacity
+        self.rejects = 0
+        self.false_positives = 0
+        self.rebuilds = 0
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        """Refill a right-sized filter from the structure's current words."""
+        words = self.structure.range_search("")
+        self.filter = BloomFilter(
+            max(self.min_capacity, 2 * len(words)), self.fp_rate, self.counting
+        )
+        for word in words:
+            self.filter.add(word)
+        self._deleted = 0
+        self.rebuilds += 1
+
+    # -------------------------------
+    # Search (filtered)
+    # -------------------------------
+    def search(self, pattern: str) -> bool:
+        if pattern not in self.filter:
+            self.rejects += 1
+            return False
+        found = self.structure.search(pattern)
+        if not found:
+            self.false_positives += 1
+        return found
+
+    def search_many(self, patterns):
+        search = self.search
+        return [search(p) for p in patterns]
+
+    # -------------------------------
+    # Other queries (passed through)
+    # -------------------------------
+    def range_search(self, suffix: str, limit=None, offset: int = 0):
+        return self.structure.range_search(suffix, limit=limit, offset=offset)
+
+    def range_search_many(self, suffixes):
+        return self.structure.range_search_many(suffixes)
+
+    def count_suffix(self, suffix: str) -> int:
+        return self.structure.count_suffix(suffix)
+
+    def memory_usage(self) -> int:
+        return self.structure.memory_usage()
+
+    # -------------------------------
+    # Updates
+    # -------------------------------
+    def insert(self, word: str) -> None:
+        if self.structure.search(word):
+            return
+        self.structure.insert(word)
+        self.filter.add(word)
+        if self.filter.items > self.filter.capacity:
+            self.rebuild()
+
+    def insert_batch(self, words) -> None:
+        self.structure.insert_batch(words)
+        self.rebuild()
+
+    def delete(self, word: str) -> None:
+        if not self.structure.search(word):
+            return
+        self.structure.delete(word)
+        if self.counting:
+            self.filter.remove(word)
+            return
+        self._deleted += 1
+        if self._deleted > self.rebuild_ratio * self.filter.items:
+            self.rebuild()
+
+    def stats(self) -> dict:
+        """Filter sizing plus the observed false-positive rate of searches."""
+        negatives = self.rejects + self.false_positives
+        return {
+            "cells": self.filter.size,
+            "hashes": self.filter.hashes,
+            "bytes": self.filter.memory_usage(),
+            "items": self.filter.items,
+            "target_fp_rate": self.fp_rate,
+            "expected_fp_rate": self.filter.expected_fp_rate(),
+            "rejects": self.rejects,
+            "false_positives": self.false_positives,
+            "observed_fp_rate": self.false_positives / negatives if negatives else 0.0,
+            "rebuilds": self.rebuilds,
+        }
@@ -0,0 +1,219 @@
+import os
+import struct
+import zlib
+
+import numpy as np
+from prefix_trie import PrefixTrie
+from sa_construction import decode_words, encode_words
+
+# Snapshot file format (see DurableTrie.compact)
+SNAPSHOT_FORMAT = "prefix-trie-snapshot"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_FILE = "snapshot.npz"
+LOG_FILE = "wal.log"
+
+# Log record: op, payload length, UTF-8 word, CRC32 of all of it
+OP_INSERT = 1
+OP_DELETE = 2
+_HEADER = struct.Struct("<BI")
+_CRC = struct.Struct("<I")
+
+
+class DurableTrie:
+    """
+    PrefixTrie (or RadixTrie) persisted as a snapshot plus an append-only
+    write-ahead log in one directory.
+
+    - snapshot.npz: every word as one encode_words code buffer, written
+      to a temporary file and renamed into place
+    - wal.log: one checksummed record per insert / delete, fsynced every
+      sync_every operations (so at most that many are lost in a crash)
+
+    Opening the directory loads the snapshot and replays the log. Once
+    the log holds more than compaction_ratio times the snapshot's word
+    count, it is folded into a new snapshot, which bounds restart time
+    by the snapshot size rather than the write history.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        trie_class=PrefixTrie,
+        sync_every: int = 64,
+        compaction_ratio: float = 0.5,
+        min_log_records: int = 1024,
+    ):
+        self.path = path
+        self.trie_class = trie_class
+        self.sync_every = sync_every
+        self.compaction_ratio = compaction_ratio
+        self.min_log_records = min_log_records
+        os.makedirs(path, exist_ok=True)
+
+        self.trie = trie_class()
+        self.snapshot_words = self._load_snapshot()
+        self.log_records = self._replay_log()
+        self._log = open(self._file(LOG_FILE), "ab")
+        self._unsynced = 0
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    # -------------------------------
+    # Queries (read the in-memory trie)
+    # -------------------------------
+    def search(self, pattern: str) -> bool:
+        return self.trie.search(pattern)
+
+    def range_search(self, suffix: str, limit=None, offset: int = 0):
+        return self.trie.range_search(suffix, limit=limit, offset=offset)
+
+    def count_suffix(self, suffix: str) -> int:
+        return self.trie.count_suffix(suffix)
+
+    def memory_report(self) -> dict:
+        return self.trie.memory_report()
+
+    # -------------------------------
+    # Updates (logged, then applied)
+    # -------------------------------
+    def insert(self, word: str) -> None:
+        self._append(OP_INSERT, word)
+        self.trie.insert(word)
+        self._after_write()
+
+    def insert_batch(self, words) -> None:
+        words = list(words)
+        for word in words:
+            self._append(OP_INSERT, word)
+        self.trie.insert_batch(words)
+        self._after_write()
+
+    def delete(self, word: str) -> None:
+        self._append(OP_DELETE, word)
+        self.trie.delete(word)
+        self._after_write()
+
+    def _append(self, op: int, word: str) -> None:
+        payload = word.encode("utf-8")
+        record = _HEADER.pack(op, len(payload)) + payload
+        self._log.write(record + _CRC.pack(zlib.crc32(record)))
+        self.log_records += 1
+        self._unsynced += 1
+
+    def _after_write(self) -> None:
+        if self._unsynced >= self.sync_every:
+            self.sync()
+        limit = max(self.min_log_records, self.compaction_ratio * self.snapshot_words)
+        if self.log_records > limit:
+            self.compact()
+
+    def sync(self) -> None:
+        """Flush buffered log records and fsync them to disk."""
+        self._log.flush()
+        os.fsync(self._log.fileno())
+        self._unsynced = 0
+
+    # -------------------------------
+    # Snapshot + log compaction
+    # -------------------------------
+    def compact(self) -> None:
+        """
+        Write the current words as a new snapshot and start an empty log.
+        The snapshot is renamed into place before the log is truncated; a
+        crash in between replays the old log over the new snapshot, which
+        is harmless since every logged operation is idempotent.
+        """
+        words = list(self.trie.iter_range_search(""))
+        codes, _, alphabet = encode_words(words)
+        points = np.array([ord(ch) for ch in alphabet], dtype=np.uint32)
+
+        tmp = self._file(SNAPSHOT_FILE + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                format=np.array(SNAPSHOT_FORMAT),
+                version=np.array(SNAPSHOT_VERSION),
+                codes=codes,
+                alphabet=points,
+            )
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self._file(SNAPSHOT_FILE))
+
+        self._log.close()
+        self._log = open(self._file(LOG_FILE), "wb")
+        os.fsync(self._log.fileno())
+        self.snapshot_words = len(words)
+        self.log_records = 0
+        self._unsynced = 0
+
+    def _load_snapshot(self) -> int:
+        path = self._file(SNAPSHOT_FILE)
+        if not os.path.exists(path):
+            return 0
+
+        with np.load(path) as snapshot:
+            if str(snapshot["format"]) != SNAPSHOT_FORMAT:
+                raise ValueError(f"{path} is not a {SNAPSHOT_FORMAT} file")
+            if int(snapshot["version"]) != SNAPSHOT_VERSION:
+                raise ValueError(
+                    f"Unsupported snapshot version {int(snapshot['version'])} "
+                    f"(expected {SNAPSHOT_VERSION})"
+                )
+            codes = snapshot["codes"]
+            alphabet = "".join(map(chr, snapshot["alphabet"].tolist()))
+
+        words = decode_words(codes, alphabet)
+        self.trie.insert_batch(words)
+        return len(words)
+
+    def _replay_log(self) -> int:
+        """
+        Apply every complete record in the log. A torn or corrupt tail
+        (a crash mid-write) ends the replay and is truncated away.
+        """
+        path = self._file(LOG_FILE)
+        if not os.path.exists(path):
+            return 0
+
+        with open(path, "rb") as f:
+            data = f.read()
+
+        records = 0
+        offset = 0
+        while offset + _HEADER.size <= len(data):
+            op, length = _HEADER.unpack_from(data, offset)
+            end = offset + _HEADER.size + length
+            if end + _CRC.size > len(data):
+                break
+            (crc,) = _CRC.unpack_from(data, end)
+            if crc != zlib.crc32(data[offset:end]) or op not in (OP_INSERT, OP_DELETE):
+                break
+
+            word = data[offset + _HEADER.size:end].decode("utf-8")
+            if op == OP_INSERT:
+                self.trie.insert(word)
+            else:
+                self.trie.delete(word)
+            records += 1
+            offset = end + _CRC.size
+
+        if offset < len(data):
+            with open(path, "r+b") as f:
+                f.truncate(offset)
+        return records
+
+    # -------------------------------
+    # Lifecycle
+    # -------------------------------
+    def close(self) -> None:
+        if not self._log.closed:
+            self.sync()
+            self._log.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
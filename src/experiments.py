@@ -2,28 +2,36 @@ import json
 import matplotlib.pyplot as plt
 import matplotlib.ticker as ticker
 from benchmarks import Benchmark
-from prefix_trie import PrefixTrie
+from prefix_trie import PrefixTrie, RadixTrie
 from suffix_array import InvertedSuffixArray
+from fm_index import FMIndex
+from sorted_word_array import SortedWordArray
 
 # -------------------------------
 # Performance plotting
 # -------------------------------
+# (results key, label, color, marker) of the structures being compared
+PLOT_STRUCTURES = [
+    ("prefix_trie", "Prefix Trie", '#2E86AB', "o"),
+    ("suffix_array", "Suffix Array", '#A23B72', "s"),
+    ("sorted_array", "Sorted Array", '#F18F01', "^"),
+]
+
+
 def plot_insert_comparison(results):
     """Plot insertion time and memory comparison"""
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
     
-    # Extract data for both structures
     sizes = [r["size"] for r in results["prefix_trie"]["insert"]]
-    
-    pt_times = [r["time_sec"] for r in results["prefix_trie"]["insert"]]
-    sa_times = [r["time_sec"] for r in results["suffix_array"]["insert"]]
-    
-    pt_memory = [r["peak_memory_bytes"] / (1024*1024) for r in results["prefix_trie"]["insert"]]
-    sa_memory = [r["peak_memory_bytes"] / (1024*1024) for r in results["suffix_array"]["insert"]]
-    
+
+    for struct, label, _, marker in PLOT_STRUCTURES:
+        inserts = results[struct]["insert"]
+        times = [r["time_sec"] for r in inserts]
+        memory = [r["peak_memory_bytes"] / (1024*1024) for r in inserts]
+        ax1.plot(sizes, times, marker=marker, label=label, linewidth=2, markersize=8)
+        ax2.plot(sizes, memory, marker=marker, label=label, linewidth=2, markersize=8)
+
     # Time plot
-    ax1.plot(sizes, pt_times, marker="o", label="Prefix Trie", linewidth=2, markersize=8)
-    ax1.plot(sizes, sa_times, marker="s", label="Suffix Array", linewidth=2, markersize=8)
     ax1.set_title("Insert Time Comparison", fontsize=14, fontweight='bold')
     ax1.set_xlabel("Dataset Size", fontsize=12)
     ax1.set_ylabel("Time (seconds)", fontsize=12)
@@ -31,8 +39,6 @@ def plot_insert_comparison(results):
     ax1.grid(True, alpha=0.3)
     
     # Memory plot
-    ax2.plot(sizes, pt_memory, marker="o", label="Prefix Trie", linewidth=2, markersize=8)
-    ax2.plot(sizes, sa_memory, marker="s", label="Suffix Array", linewidth=2, markersize=8)
     ax2.set_title("Insert Peak Memory Comparison", fontsize=14, fontweight='bold')
     ax2.set_xlabel("Dataset Size", fontsize=12)
     ax2.set_ylabel("Memory (MB)", fontsize=12)
@@ -49,9 +55,9 @@ def plot_search_comparison(results):
     """Plot search performance comparison"""
     fig, ax = plt.subplots(figsize=(10, 6))
     
-    structures = ["prefix_trie", "suffix_array"]
-    labels = ["Prefix Trie", "Suffix Array"]
-    colors = ['#2E86AB', '#A23B72']
+    structures = [struct for struct, _, _, _ in PLOT_STRUCTURES]
+    labels = [label for _, label, _, _ in PLOT_STRUCTURES]
+    colors = [color for _, _, color, _ in PLOT_STRUCTURES]
     
     avg_times = []
     for struct in structures:
@@ -83,9 +89,9 @@ def plot_range_search_comparison(results):
     """Plot range search performance comparison"""
     fig, ax = plt.subplots(figsize=(10, 6))
     
-    structures = ["prefix_trie", "suffix_array"]
-    labels = ["Prefix Trie", "Suffix Array"]
-    colors = ['#2E86AB', '#A23B72']
+    structures = [struct for struct, _, _, _ in PLOT_STRUCTURES]
+    labels = [label for _, label, _, _ in PLOT_STRUCTURES]
+    colors = [color for _, _, color, _ in PLOT_STRUCTURES]
     
     avg_times = []
     for struct in structures:
@@ -117,9 +123,9 @@ def plot_delete_comparison(results):
     """Plot deletion performance comparison"""
     fig, ax = plt.subplots(figsize=(10, 6))
     
-    structures = ["prefix_trie", "suffix_array"]
-    labels = ["Prefix Trie", "Suffix Array"]
-    colors = ['#2E86AB', '#A23B72']
+    structures = [struct for struct, _, _, _ in PLOT_STRUCTURES]
+    labels = [label for _, label, _, _ in PLOT_STRUCTURES]
+    colors = [color for _, _, color, _ in PLOT_STRUCTURES]
     
     avg_times = []
     for struct in structures:
@@ -156,11 +162,9 @@ def plot_all_operations_comparison(results):
     # 1. Insert Time (top-left)
     ax = axes[0, 0]
     sizes = [r["size"] for r in results["prefix_trie"]["insert"]]
-    pt_times = [r["time_sec"] for r in results["prefix_trie"]["insert"]]
-    sa_times = [r["time_sec"] for r in results["suffix_array"]["insert"]]
-    
-    ax.plot(sizes, pt_times, marker="o", label="Prefix Trie", linewidth=2.5, markersize=10, color='#2E86AB')
-    ax.plot(sizes, sa_times, marker="s", label="Suffix Array", linewidth=2.5, markersize=10, color='#A23B72')
+    for struct, label, color, marker in PLOT_STRUCTURES:
+        times = [r["time_sec"] for r in results[struct]["insert"]]
+        ax.plot(sizes, times, marker=marker, label=label, linewidth=2.5, markersize=10, color=color)
     ax.set_title("Insert Time vs Dataset Size", fontsize=13, fontweight='bold')
     ax.set_xlabel("Dataset Size", fontsize=11)
     ax.set_ylabel("Time (seconds)", fontsize=11)
@@ -169,11 +173,9 @@ def plot_all_operations_comparison(results):
     
     # 2. Insert Memory (top-right)
     ax = axes[0, 1]
-    pt_memory = [r["peak_memory_bytes"] / (1024*1024) for r in results["prefix_trie"]["insert"]]
-    sa_memory = [r["peak_memory_bytes"] / (1024*1024) for r in results["suffix_array"]["insert"]]
-    
-    ax.plot(sizes, pt_memory, marker="o", label="Prefix Trie", linewidth=2.5, markersize=10, color='#2E86AB')
-    ax.plot(sizes, sa_memory, marker="s", label="Suffix Array", linewidth=2.5, markersize=10, color='#A23B72')
+    for struct, label, color, marker in PLOT_STRUCTURES:
+        memory = [r["peak_memory_bytes"] / (1024*1024) for r in results[struct]["insert"]]
+        ax.plot(sizes, memory, marker=marker, label=label, linewidth=2.5, markersize=10, color=color)
     ax.set_title("Memory Usage inserting vs Dataset Size", fontsize=13, fontweight='bold')
     ax.set_xlabel("Dataset Size", fontsize=11)
     ax.set_ylabel("Memory (MB)", fontsize=11)
@@ -183,24 +185,17 @@ def plot_all_operations_comparison(results):
     # 3. Search Time (bottom-left)
     ax = axes[1, 0]
     operations = ["Search", "Range Search", "Delete"]
-    pt_values = []
-    sa_values = []
-    
-    for op_key in ["search", "range_search", "delete"]:
-        if results["prefix_trie"][op_key]:
-            pt_values.append(results["prefix_trie"][op_key][0]["avg_time_sec"] * 1000000)
-        else:
-            pt_values.append(0)
-        
-        if results["suffix_array"][op_key]:
-            sa_values.append(results["suffix_array"][op_key][0]["avg_time_sec"] * 1000000)
-        else:
-            sa_values.append(0)
-    
     x = range(len(operations))
-    width = 0.35
-    ax.bar([i - width/2 for i in x], pt_values, width, label='Prefix Trie', color='#2E86AB', alpha=0.8, edgecolor='black')
-    ax.bar([i + width/2 for i in x], sa_values, width, label='Suffix Array', color='#A23B72', alpha=0.8, edgecolor='black')
+    width = 0.8 / len(PLOT_STRUCTURES)
+    for k, (struct, label, color, _) in enumerate(PLOT_STRUCTURES):
+        values = []
+        for op_key in ["search", "range_search", "delete"]:
+            if results[struct][op_key]:
+                values.append(results[struct][op_key][0]["avg_time_sec"] * 1000000)
+            else:
+                values.append(0)
+        shift = (k - (len(PLOT_STRUCTURES) - 1) / 2) * width
+        ax.bar([i + shift for i in x], values, width, label=label, color=color, alpha=0.8, edgecolor='black')
     ax.set_title("Operation Time Comparison", fontsize=13, fontweight='bold')
     ax.set_ylabel("Average Time (µs)", fontsize=11)
     ax.set_xticks(x)
@@ -214,29 +209,32 @@ def plot_all_operations_comparison(results):
     ax.axis('off')
     
     table_data = []
-    table_data.append(["Operation", "Prefix Trie", "Suffix Array"])
+    table_data.append(["Operation"] + [label for _, label, _, _ in PLOT_STRUCTURES])
     
     for op_key, op_name in [("insert", "Insert"), ("search", "Search"), 
                              ("range_search", "Range Search"), ("delete", "Delete")]:
         if results["prefix_trie"][op_key]:
-            pt_mem = results["prefix_trie"][op_key][-1 if op_key == "insert" else 0]["peak_memory_bytes"] / (1024*1024)
-            sa_mem = results["suffix_array"][op_key][-1 if op_key == "insert" else 0]["peak_memory_bytes"] / (1024*1024)
-            table_data.append([op_name, f"{pt_mem:.2f} MB", f"{sa_mem:.2f} MB"])
+            row = [op_name]
+            for struct, _, _, _ in PLOT_STRUCTURES:
+                mem = results[struct][op_key][-1 if op_key == "insert" else 0]["peak_memory_bytes"] / (1024*1024)
+                row.append(f"{mem:.2f} MB")
+            table_data.append(row)
     
+    columns = len(table_data[0])
     table = ax.table(cellText=table_data, cellLoc='center', loc='center',
-                     colWidths=[0.3, 0.35, 0.35])
+                     colWidths=[0.25] + [0.75 / (columns - 1)] * (columns - 1))
     table.auto_set_font_size(False)
     table.set_fontsize(10)
     table.scale(1, 2)
     
     # Style header row
-    for i in range(3):
+    for i in range(columns):
         table[(0, i)].set_facecolor('#4A90E2')
         table[(0, i)].set_text_props(weight='bold', color='white')
     
     # Alternate row colors
     for i in range(1, len(table_data)):
-        for j in range(3):
+        for j in range(columns):
             if i % 2 == 0:
                 table[(i, j)].set_facecolor('#F0F0F0')
     
@@ -266,12 +264,72 @@ if __name__ == "__main__":
     benchmark = Benchmark()
     
     # Run benchmarks for PrefixTrie
-    print("\n[1/2] Benchmarking Prefix Trie...")
+    print("\n[1/5] Benchmarking Prefix Trie...")
     benchmark.run_all(PrefixTrie, "prefix_trie")
+
+    # Run benchmarks for the path-compressed RadixTrie
+    print("\n[2/5] Benchmarking Radix Trie...")
+    benchmark.run_all(RadixTrie, "radix_trie")
     
     # Run benchmarks for InvertedSuffixArray
-    print("\n[2/2] Benchmarking Suffix Array...")
+    print("\n[3/5] Benchmarking Suffix Array...")
     benchmark.run_all(InvertedSuffixArray, "suffix_array")
+
+    # Run benchmarks for the compressed FMIndex
+    print("\n[4/5] Benchmarking FM-index...")
+    benchmark.run_all(FMIndex, "fm_index")
+
+    # Run benchmarks for the front-coded SortedWordArray
+    print("\n[5/5] Benchmarking Sorted Word Array...")
+    benchmark.run_all(SortedWordArray, "sorted_array")
+
+    # Compare suffix array and FM-index footprints
+    print("\nComparing suffix array and FM-index memory...")
+    benchmark.benchmark_index_memory()
+
+    # Compare the frozen array trie with the dict trie
+    print("\nComparing frozen and dict tries...")
+    benchmark.benchmark_frozen_trie()
+
+    # Compare trie bulk loading with per-word inserts
+    print("\nComparing trie bulk loading with per-word inserts...")
+    benchmark.benchmark_bulk_load()
+
+    # Measure subtree-count augmented tries
+    print("\nMeasuring subtree-count augmented tries...")
+    benchmark.benchmark_subtree_counts()
+
+    # Compare snapshot + log recovery with a full replay
+    print("\nMeasuring trie snapshot + log recovery...")
+    benchmark.benchmark_recovery()
+
+    # Compare locked reads with snapshot swapping during rebuilds
+    print("\nMeasuring suffix array reads during rebuilds...")
+    benchmark.benchmark_snapshot_reads()
+
+    # Measure query server latency and QPS with and without coalescing
+    print("\nLoad-testing the query server...")
+    benchmark.benchmark_query_server()
+
+    # Measure sharded index throughput across processes
+    print("\nMeasuring sharded index throughput...")
+    benchmark.benchmark_sharded()
+
+    # Measure the LRU query cache on a skewed workload
+    print("\nMeasuring the LRU query cache...")
+    benchmark.benchmark_query_cache()
+
+    # Measure the Bloom filter front-end on mostly-absent searches
+    print("\nMeasuring the Bloom filter front-end...")
+    benchmark.benchmark_membership_filter()
+
+    # Compare suffix array construction algorithms
+    print("\nComparing suffix array construction algorithms...")
+    benchmark.benchmark_sa_construction()
+
+    # Measure multi-core suffix array construction
+    print("\nMeasuring parallel suffix array construction...")
+    benchmark.benchmark_parallel_build()
     
     # Save results to JSON in results/data
     results_file = "results/data/benchmark_results.json"
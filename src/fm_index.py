@@ -0,0 +1,267 @@
+import numpy as np
+from memory_report import MemoryCounter
+from sa_construction import (
+    SENTINEL,
+    build_suffix_array,
+    decode_words,
+    encode_words,
+    sentinel_ranks,
+    suffix_array_builder,
+)
+
+
+class FMIndex:
+    """
+    Compressed suffix index over the inverted words: Burrows-Wheeler
+    transform of the sentinel-separated text, checkpointed occurrence
+    counts for rank queries, and a suffix array sampled at word starts.
+
+    Neither the text nor the words are stored. Matches come from backward
+    search, and a word is decoded by LF-walking its characters back from
+    its sentinel row. Same search / range_search / delete API as
+    InvertedSuffixArray.
+    """
+
+    # BWT positions per occurrence checkpoint (2^BLOCK_SHIFT)
+    BLOCK_SHIFT = 7
+
+    def __init__(self, algorithm: str = "doubling", compaction_threshold: float = 0.2):
+        # Reject unknown algorithms now rather than on the first build
+        suffix_array_builder(algorithm)
+        self.algorithm = algorithm
+        self.compaction_threshold = compaction_threshold
+        self.alphabet = ""
+        self._char_codes = {}
+        self.bwt = np.array([], dtype=np.uint8)
+        self.occ = np.zeros((1, 1), dtype=np.int32)
+        self.C = np.zeros(1, dtype=np.int64)
+        self.start_ids = np.array([], dtype=np.int32)
+        self._dead = bytearray()
+        self.dead_count = 0
+
+    # -------------------------------
+    # String inversion
+    # -------------------------------
+    def invert_string(self, s: str) -> str:
+        return s[::-1]
+
+    # -------------------------------
+    # Insert: rebuild over live words + new ones
+    # -------------------------------
+    def insert(self, word: str) -> None:
+        self.insert_batch([word])
+
+    def insert_batch(self, words):
+        """
+        Insert multiple words with a single rebuild. The current words are
+        decoded back out of the BWT, so no plain copy is ever kept.
+        """
+        inverted = [self.invert_string(w) for w in self._live_words()]
+        seen = set(inverted)
+        for word in words:
+            word = self.invert_string(word)
+            if word not in seen:
+                seen.add(word)
+                inverted.append(word)
+        self._build(inverted)
+
+    # -------------------------------
+    # Build: BWT, occurrence checkpoints, word-start samples
+    # -------------------------------
+    def _build(self, inverted_words) -> None:
+        codes, word_starts, self.alphabet = encode_words(inverted_words)
+        self._char_codes = {ch: i + 1 for i, ch in enumerate(self.alphabet)}
+        sigma = len(self.alphabet) + 1
+        n = len(codes)
+
+        sa = build_suffix_array(sentinel_ranks(codes, word_starts), self.algorithm)
+
+        # BWT: the character before each suffix (codes[-1] is a sentinel)
+        self.bwt = codes[sa.astype(np.int64) - 1] if n else codes
+
+        # occ[b, c]: occurrences of c in bwt[:b << BLOCK_SHIFT]
+        blocks = (n >> self.BLOCK_SHIFT) + 1
+        block_of = np.arange(n) >> self.BLOCK_SHIFT
+        per_block = np.bincount(block_of * sigma + self.bwt,
+                                minlength=blocks * sigma).reshape(blocks, sigma)
+        self.occ = np.zeros((blocks + 1, sigma), dtype=np.int32)
+        self.occ[1:] = np.cumsum(per_block, axis=0)
+
+        # C[c]: number of symbols smaller than c. Sentinels (code 0) sort
+        # first, by word id, so word i's sentinel is row i.
+        counts = np.bincount(self.bwt, minlength=sigma)
+        self.C = np.concatenate(([0], np.cumsum(counts)[:-1])).astype(np.int64)
+
+        # SA sampled at word starts, i.e. at rows whose BWT symbol is a
+        # sentinel: start_ids[k] is the word id of the k-th such row
+        start_rows = np.flatnonzero(self.bwt == SENTINEL)
+        self.start_ids = (np.searchsorted(word_starts, sa[start_rows], side="right")
+                          - 1).astype(np.int32)
+
+        self._dead = bytearray(len(inverted_words))
+        self.dead_count = 0
+
+    # -------------------------------
+    # Rank / LF mapping
+    # -------------------------------
+    def _rank(self, c: int, i: int) -> int:
+        """Occurrences of code c in bwt[:i]."""
+        block = i >> self.BLOCK_SHIFT
+        start = block << self.BLOCK_SHIFT
+        return int(self.occ[block, c]) + int(np.count_nonzero(self.bwt[start:i] == c))
+
+    def _lf_many(self, rows, chars) -> np.ndarray:
+        """Vectorized LF mapping of rows whose BWT symbols are chars."""
+        block = rows >> self.BLOCK_SHIFT
+        offsets = np.arange(1 << self.BLOCK_SHIFT)
+        window = (block << self.BLOCK_SHIFT)[:, None] + offsets
+        in_block = window < rows[:, None]
+        symbols = self.bwt[np.minimum(window, len(self.bwt) - 1)]
+        partial = ((symbols == chars[:, None]) & in_block).sum(axis=1)
+        return self.C[chars] + self.occ[block, chars] + partial
+
+    def _backward_search(self, codes, lo: int, hi: int):
+        """Narrow rows [lo, hi) to those whose suffix starts with codes + old prefix."""
+        for c in reversed(codes):
+            lo = int(self.C[c]) + self._rank(c, lo)
+            hi = int(self.C[c]) + self._rank(c, hi)
+            if lo >= hi:
+                return lo, lo
+        return lo, hi
+
+    def _live_start_ids(self, lo: int, hi: int) -> np.ndarray:
+        """Ids of live words whose first suffix is in rows [lo, hi), in row order."""
+        ids = self.start_ids[self._rank(SENTINEL, lo):self._rank(SENTINEL, hi)]
+        if self.dead_count:
+            dead = np.frombuffer(self._dead, dtype=np.uint8)
+            ids = ids[dead[ids] == 0]
+        return ids
+
+    # -------------------------------
+    # Word extraction
+    # -------------------------------
+    def _extract(self, ids):
+        """
+        Original words for word ids, LF-walking all of them in lock-step.
+        Walking back from word i's sentinel row (row i) reads the inverted
+        word from its end, which spells the original word forwards.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        if len(ids) == 0:
+            return []
+
+        rows = ids.copy()
+        lengths = np.zeros(len(ids), dtype=np.int64)
+        columns = []
+        active = np.arange(len(ids))
+        while active.size:
+            chars = self.bwt[rows[active]].astype(np.int64)
+            column = np.zeros(len(ids), dtype=self.bwt.dtype)
+            column[active] = chars
+            columns.append(column)
+
+            moving = chars != SENTINEL
+            active, chars = active[moving], chars[moving]
+            lengths[active] += 1
+            rows[active] = self._lf_many(rows[active], chars)
+
+        # Rows of the matrix are the words, each ended by a sentinel
+        matrix = np.stack(columns, axis=1)
+        keep = np.arange(matrix.shape[1]) <= lengths[:, None]
+        return decode_words(matrix[keep], self.alphabet)
+
+    def _live_words(self):
+        dead = np.frombuffer(self._dead, dtype=np.uint8)
+        return self._extract(np.flatnonzero(dead == 0))
+
+    # -------------------------------
+    # Search: backward search (O(m) rank queries)
+    # -------------------------------
+    def search(self, pattern: str) -> bool:
+        codes = self._encode_pattern(self.invert_string(pattern))
+        if codes is None:
+            return False
+
+        # Start from the sentinel rows, i.e. search for pattern + sentinel
+        lo, hi = self._backward_search(codes, 0, len(self.start_ids))
+        return len(self._live_start_ids(lo, hi)) > 0
+
+    def search_many(self, patterns):
+        search = self.search
+        return [search(p) for p in patterns]
+
+    def range_search_many(self, patterns):
+        range_search = self.range_search
+        return [range_search(p) for p in patterns]
+
+    # -------------------------------
+    # Range search (word-suffix query)
+    # -------------------------------
+    def range_search(self, pattern: str, limit=None, offset: int = 0):
+        stop = None if limit is None else offset + limit
+        ids = self._range_ids(pattern)[offset:stop]
+        return self._extract(ids)
+
+    def iter_range_search(self, pattern: str, chunk: int = 1024):
+        ids = self._range_ids(pattern)
+        for start in range(0, len(ids), chunk):
+            yield from self._extract(ids[start:start + chunk])
+
+    def count_suffix(self, pattern: str) -> int:
+        return len(self._range_ids(pattern))
+
+    def _range_ids(self, pattern: str) -> np.ndarray:
+        codes = self._encode_pattern(self.invert_string(pattern))
+        if codes is None:
+            return np.array([], dtype=np.int32)
+        lo, hi = self._backward_search(codes, 0, len(self.bwt))
+        return self._live_start_ids(lo, hi)
+
+    def _encode_pattern(self, pattern: str):
+        char_codes = self._char_codes
+        try:
+            return [char_codes[ch] for ch in pattern]
+        except KeyError:
+            return None
+
+    # -------------------------------
+    # Delete: tombstone, compact when the dead ratio is too high
+    # -------------------------------
+    def delete(self, word: str) -> None:
+        codes = self._encode_pattern(self.invert_string(word))
+        if codes is None:
+            return
+        lo, hi = self._backward_search(codes, 0, len(self.start_ids))
+        ids = self._live_start_ids(lo, hi)
+        if not len(ids):
+            return
+
+        self._dead[int(ids[0])] = 1
+        self.dead_count += 1
+        if self.dead_count > self.compaction_threshold * len(self._dead):
+            self.compact()
+
+    def compact(self) -> None:
+        """Rebuild over the live words only."""
+        if self.dead_count:
+            self._build([self.invert_string(w) for w in self._live_words()])
+
+    # -------------------------------
+    # Memory usage (bytes)
+    # -------------------------------
+    def memory_usage(self) -> int:
+        return (self.bwt.nbytes + self.occ.nbytes + self.C.nbytes
+                + self.start_ids.nbytes + len(self._dead))
+
+    def memory_report(self) -> dict:
+        """
+        Bytes of the BWT, the occurrence checkpoints plus C table, the
+        word ids of the word-start rows, the tombstones and the alphabet.
+        """
+        counter = MemoryCounter()
+        counter.add_arrays("bwt", self.bwt)
+        counter.add_arrays("occurrence_table", self.occ, self.C)
+        counter.add_arrays("sampled_sa", self.start_ids)
+        counter.add_objects("tombstones", [self._dead])
+        counter.add_objects("alphabet", [self.alphabet, self._char_codes])
+        return counter.report()
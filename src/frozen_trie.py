@@ -0,0 +1,285 @@
+import json
+import os
+
+import numpy as np
+from memory_report import MemoryCounter
+from sa_construction import decode_table, decode_words, encode_words
+
+# On-disk format (see FrozenTrie.save)
+FROZEN_FORMAT = "frozen-prefix-trie"
+FROZEN_VERSION = 1
+FROZEN_ARRAYS = ("base", "check", "terminal", "word_lo", "word_hi",
+                 "codes", "word_starts")
+
+
+class FrozenTrie:
+    """
+    Immutable double-array trie over inverted words, built by
+    PrefixTrie.freeze().
+
+    The transition from state s on character code c goes to
+    t = base[s] + c, and is valid iff check[t] == s. That is two array
+    reads per character and no per-node objects. States are laid out
+    from a preorder walk with sorted children, so the words below any
+    state are one contiguous slice, [word_lo[s], word_hi[s]), of a
+    compact code buffer (see sa_construction.encode_words).
+    """
+
+    def __init__(self, root):
+        words = []
+        self._collect_words(root, words)
+        self.codes, self.word_starts, self.alphabet = encode_words(words)
+        self._char_codes = {ch: i + 1 for i, ch in enumerate(self.alphabet)}
+        self._place(root)
+        self._views()
+
+    @staticmethod
+    def _collect_words(root, words) -> None:
+        """Words in preorder with sorted children: the range query order."""
+        stack = [(root, "")]
+        while stack:
+            node, path = stack.pop()
+            if node.is_end:
+                words.append(path[::-1])
+            for char, child in sorted(node.children.items(), reverse=True):
+                stack.append((child, path + char))
+
+    # -------------------------------
+    # Double-array construction
+    # -------------------------------
+    def _place(self, root) -> None:
+        """
+        Walk the trie in the same preorder as _collect_words. Each node's
+        children get the first base at which all their codes land on free
+        slots (first-fit over a free-slot bytearray, so the scan runs in
+        C), and its words are the ones counted between entering and
+        leaving it.
+        """
+        sigma = len(self.alphabet)
+        char_codes = self._char_codes
+
+        pad = bytes(1024 + sigma)
+        used = bytearray(pad)
+        used[0] = 1
+        base, check, terminal, word_lo, word_hi = {}, {}, {}, {}, {}
+        free = 1
+        words = 0
+
+        # (node, state); node None marks leaving state
+        stack = [(root, 0)]
+        while stack:
+            node, state = stack.pop()
+            if node is None:
+                word_hi[state] = words
+                continue
+
+            word_lo[state] = words
+            if node.is_end:
+                terminal[state] = 1
+                words += 1
+            stack.append((None, state))
+            if not node.children:
+                continue
+
+            kids = sorted(node.children.items())
+            codes = [char_codes[char] for char, _ in kids]
+            slot = free
+            while True:
+                slot = used.find(0, slot)
+                b = slot - codes[0]
+                if b >= 0:
+                    if b + codes[-1] >= len(used):
+                        used.extend(pad)
+                    if not any(used[b + c] for c in codes):
+                        break
+                slot += 1
+
+            base[state] = b
+            for c in codes:
+                used[b + c] = 1
+                check[b + c] = state
+            for (_, child), c in zip(reversed(kids), reversed(codes)):
+                stack.append((child, b + c))
+            free = used.find(0, free)
+            if free < 0:
+                free = len(used)
+                used.extend(pad)
+
+        # Pad so base[s] + c never runs off the end, even for the
+        # out-of-alphabet code sigma + 1
+        size = max(max(check, default=0), max(base.values(), default=0)) + sigma + 2
+        self.base = self._dense(base, size, 0, np.int32)
+        self.check = self._dense(check, size, -1, np.int32)
+        self.terminal = self._dense(terminal, size, 0, np.uint8)
+        self.word_lo = self._dense(word_lo, size, 0, np.int32)
+        self.word_hi = self._dense(word_hi, size, 0, np.int32)
+
+    @staticmethod
+    def _dense(values: dict, size: int, fill, dtype) -> np.ndarray:
+        array = np.full(size, fill, dtype=dtype)
+        array[np.fromiter(values.keys(), dtype=np.int64, count=len(values))] = \
+            np.fromiter(values.values(), dtype=dtype, count=len(values))
+        return array
+
+    def _views(self) -> None:
+        """
+        memoryviews for fast scalar reads in the lookup loops, and the
+        cached code point table for decoding results.
+        """
+        self._decode_table = decode_table(self.alphabet)
+        self._base_view = memoryview(self.base)
+        self._check_view = memoryview(self.check)
+        self._terminal_view = memoryview(self.terminal)
+
+    # -------------------------------
+    # Pickling: memoryviews are rebuilt, not pickled
+    # -------------------------------
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for name in ("_decode_table", "_base_view", "_check_view", "_terminal_view"):
+            del state[name]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._views()
+
+    # -------------------------------
+    # String inversion
+    # -------------------------------
+    def invert_string(self, s: str) -> str:
+        return s[::-1]
+
+    # -------------------------------
+    # Search (O(m))
+    # -------------------------------
+    def search(self, pattern: str) -> bool:
+        # _walk inlined: this is the hot path
+        base, check = self._base_view, self._check_view
+        code_of, missing = self._char_codes.get, len(self.alphabet) + 1
+        state = 0
+        for char in reversed(pattern):
+            target = base[state] + code_of(char, missing)
+            if check[target] != state:
+                return False
+            state = target
+        return self._terminal_view[state] == 1
+
+    def _walk(self, pattern: str) -> int:
+        """
+        State reached by the inverted pattern, or -1. Characters outside
+        the alphabet get code sigma + 1, which no transition uses.
+        """
+        base, check = self._base_view, self._check_view
+        code_of, missing = self._char_codes.get, len(self.alphabet) + 1
+        state = 0
+        for char in reversed(pattern):
+            target = base[state] + code_of(char, missing)
+            if check[target] != state:
+                return -1
+            state = target
+        return state
+
+    def search_many(self, patterns):
+        search = self.search
+        return [search(p) for p in patterns]
+
+    # -------------------------------
+    # Range Search (suffix query)
+    # -------------------------------
+    def range_search(self, suffix: str, limit=None, offset: int = 0):
+        lo, hi = self._word_range(suffix)
+        lo = min(lo + offset, hi)
+        if limit is not None:
+            hi = min(hi, lo + limit)
+        return self._words(lo, hi)
+
+    def iter_range_search(self, suffix: str, chunk: int = 1024):
+        lo, hi = self._word_range(suffix)
+        for start in range(lo, hi, chunk):
+            yield from self._words(start, min(start + chunk, hi))
+
+    def count_suffix(self, suffix: str) -> int:
+        lo, hi = self._word_range(suffix)
+        return hi - lo
+
+    def range_search_many(self, suffixes):
+        range_search = self.range_search
+        return [range_search(s) for s in suffixes]
+
+    def _word_range(self, suffix: str):
+        state = self._walk(suffix)
+        if state < 0:
+            return 0, 0
+        return int(self.word_lo[state]), int(self.word_hi[state])
+
+    def _words(self, lo: int, hi: int):
+        if lo >= hi:
+            return []
+        start, end = self.word_starts[lo], self.word_starts[hi]
+        return decode_words(self.codes[start:end], self.alphabet, self._decode_table)
+
+    # -------------------------------
+    # Memory usage (bytes)
+    # -------------------------------
+    def memory_usage(self) -> int:
+        return sum(getattr(self, name).nbytes for name in FROZEN_ARRAYS)
+
+    def memory_report(self) -> dict:
+        """
+        Bytes of the base / check transition arrays, the terminal flags,
+        the per-state word ranges, the code buffer with its word offsets,
+        and the alphabet.
+        """
+        counter = MemoryCounter()
+        counter.add_arrays("transitions", self.base, self.check)
+        counter.add_arrays("terminal", self.terminal)
+        counter.add_arrays("word_ranges", self.word_lo, self.word_hi)
+        counter.add_arrays("text", self.codes)
+        counter.add_arrays("word_index", self.word_starts)
+        counter.add_objects("alphabet", [self.alphabet, self._char_codes])
+        return counter.report()
+
+    # -------------------------------
+    # Persistence (memory-mapped loading)
+    # -------------------------------
+    def save(self, path: str) -> None:
+        """
+        Write the trie to a directory: one .npy file per array and
+        meta.json (written last) with the format version and alphabet.
+        """
+        os.makedirs(path, exist_ok=True)
+        for name in FROZEN_ARRAYS:
+            np.save(os.path.join(path, f"{name}.npy"), getattr(self, name))
+
+        meta = {
+            "format": FROZEN_FORMAT,
+            "version": FROZEN_VERSION,
+            "alphabet": self.alphabet,
+            "words": len(self.word_starts) - 1,
+        }
+        with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=4)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "FrozenTrie":
+        """Load a trie written by save(), memory-mapped read-only by default."""
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format") != FROZEN_FORMAT:
+            raise ValueError(f"{path} is not a {FROZEN_FORMAT} index")
+        if meta.get("version") != FROZEN_VERSION:
+            raise ValueError(
+                f"Unsupported index version {meta.get('version')} "
+                f"(expected {FROZEN_VERSION})"
+            )
+
+        trie = cls.__new__(cls)
+        mmap_mode = "r" if mmap else None
+        for name in FROZEN_ARRAYS:
+            setattr(trie, name,
+                    np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode))
+        trie.alphabet = meta["alphabet"]
+        trie._char_codes = {ch: i + 1 for i, ch in enumerate(trie.alphabet)}
+        trie._views()
+        return trie
@@ -0,0 +1,42 @@
+import sys
+
+
+# -------------------------------
+# Byte accounting helpers for memory_report()
+# -------------------------------
+class MemoryCounter:
+    """
+    Accumulates real byte sizes per component. Python objects are
+    measured with sys.getsizeof and counted once even when shared (a
+    cached one-character key, a word held by two containers), NumPy
+    arrays by nbytes.
+    """
+
+    def __init__(self):
+        self.components = {}
+        self._seen = set()
+
+    def add_objects(self, component: str, objects) -> None:
+        """Add the getsizeof of every object not counted yet."""
+        seen = self._seen
+        total = self.components.get(component, 0)
+        for obj in objects:
+            key = id(obj)
+            if key not in seen:
+                seen.add(key)
+                total += sys.getsizeof(obj)
+        self.components[component] = total
+
+    def add_arrays(self, component: str, *arrays) -> None:
+        """Add the data size of NumPy arrays (None is skipped)."""
+        total = sum(a.nbytes for a in arrays if a is not None)
+        self.components[component] = self.components.get(component, 0) + total
+
+    def add_bytes(self, component: str, size: int) -> None:
+        self.components[component] = self.components.get(component, 0) + size
+
+    def report(self) -> dict:
+        """Per-component bytes plus their "total"."""
+        report = dict(self.components)
+        report["total"] = sum(self.components.values())
+        return report
@@ -0,0 +1,166 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+# -------------------------------
+# Shared-memory arrays
+# -------------------------------
+def _share(array):
+    """Copy an array into a new shared memory block."""
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    view = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+    view[:] = array
+    return shm, (shm.name, array.shape, array.dtype.str)
+
+
+def _attach(spec):
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+
+# -------------------------------
+# Bucket sort (runs in the workers)
+# -------------------------------
+def _sort_bucket(codes, word_starts, positions):
+    """
+    Sort suffix positions that share their first character. The key is
+    the rest of the suffix up to its word's sentinel (zero padded),
+    then the word id. That is the same order as sentinel_ranks gives.
+
+    Key columns are compared in chunks of doubling width, and every
+    round only re-sorts the groups still tied on all columns so far, so
+    the work follows the common prefix lengths in the bucket rather than
+    its longest suffix.
+    """
+    positions = positions.astype(np.int64)
+    ids = np.searchsorted(word_starts, positions, side="right") - 1
+    ends = word_starts[ids + 1] - 1
+    last = len(codes) - 1
+
+    # order[k] is the suffix in slot k. A group is a run of slots tied so
+    # far, labelled by its first slot; active lists the slots of the
+    # groups that are still tied and not yet past their word ends
+    order = np.arange(len(positions))
+    group = np.zeros(len(positions), dtype=np.int64)
+    active = order.copy()
+    depth, width = 1, 8
+    while len(active) > 1:
+        items = order[active]
+        starts = positions[items]
+        columns = starts[:, None] + np.arange(depth, depth + width)
+        matrix = np.where(columns < ends[items, None],
+                          codes[np.minimum(columns, last)], 0)
+
+        keys = [ids[items]] + [matrix[:, j] for j in range(width - 1, -1, -1)]
+        perm = np.lexsort(keys + [group[items]])
+        items, matrix = items[perm], matrix[perm]
+        order[active] = items
+
+        # Split the groups where the old label or any column changes
+        labels = group[items]
+        new_run = np.ones(len(items), dtype=bool)
+        new_run[1:] = (labels[1:] != labels[:-1]) | (matrix[1:] != matrix[:-1]).any(axis=1)
+        run_starts = np.flatnonzero(new_run)
+        run_sizes = np.diff(np.append(run_starts, len(items)))
+        group[items] = np.repeat(active[run_starts], run_sizes)
+
+        # A tied run is done once all its words have ended (the word id
+        # has ordered them); otherwise it is sorted again, and the words
+        # that ended get zero columns and move to the front
+        going_on = positions[items] + depth + width < ends[items]
+        unfinished = (run_sizes > 1) & (np.add.reduceat(going_on, run_starts) > 0)
+        active = active[np.repeat(unfinished, run_sizes)]
+        depth += width
+        width *= 2
+    return positions[order]
+
+
+def _sort_bucket_shared(codes_spec, starts_spec, sa_spec, lo, hi):
+    """Worker entry point: sort sa[lo:hi] in place in shared memory."""
+    blocks = []
+    try:
+        shm, codes = _attach(codes_spec)
+        blocks.append(shm)
+        shm, word_starts = _attach(starts_spec)
+        blocks.append(shm)
+        shm, sa = _attach(sa_spec)
+        blocks.append(shm)
+        sa[lo:hi] = _sort_bucket(codes, word_starts, sa[lo:hi])
+        del codes, word_starts, sa
+    finally:
+        for shm in blocks:
+            shm.close()
+
+
+# -------------------------------
+# Parallel suffix array construction
+# -------------------------------
+def parallel_suffix_array(codes, word_starts, workers=None) -> np.ndarray:
+    """
+    Build the suffix array of a sentinel-separated code buffer (see
+    sa_construction.encode_words) on several cores.
+
+    Suffix positions are bucketed by leading code with one stable
+    argsort. A bucket's final place in the SA is known from the bucket
+    sizes, so every bucket is sorted independently in a
+    ProcessPoolExecutor. The workers read the text from shared memory and
+    write their bucket straight into a shared output array, so nothing
+    has to be stitched together afterwards. The result is identical to
+    build_suffix_array(sentinel_ranks(codes, word_starts)).
+
+    Args:
+        codes: code buffer, SENTINEL (0) after every word
+        word_starts: word offsets plus len(codes) at the end
+        workers: process count (None -> os.cpu_count())
+    """
+    codes = np.asarray(codes)
+    word_starts = np.asarray(word_starts, dtype=np.int64)
+    workers = workers or os.cpu_count() or 1
+    if len(codes) == 0:
+        return np.array([], dtype=np.int32)
+
+    # Sentinels sort first, by word id, which is their text order; the
+    # stable argsort leaves them exactly like that
+    sa = np.argsort(codes, kind="stable").astype(np.int32)
+    bounds = np.concatenate(([0], np.cumsum(np.bincount(codes))))
+    buckets = [(int(lo), int(hi)) for lo, hi in zip(bounds[1:-1], bounds[2:])
+               if hi - lo > 1]
+
+    if workers == 1:
+        for lo, hi in buckets:
+            sa[lo:hi] = _sort_bucket(codes, word_starts, sa[lo:hi])
+        return sa
+
+    blocks = []
+    try:
+        shm, codes_spec = _share(codes)
+        blocks.append(shm)
+        shm, starts_spec = _share(word_starts)
+        blocks.append(shm)
+        sa_shm, sa_spec = _share(sa)
+        blocks.append(sa_shm)
+
+        # Largest buckets first for better load balance
+        buckets.sort(key=lambda b: b[0] - b[1])
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_sort_bucket_shared, codes_spec, starts_spec,
+                            sa_spec, lo, hi)
+                for lo, hi in buckets
+            ]
+            for future in futures:
+                future.result()
+
+        shared_sa = np.ndarray(sa.shape, dtype=sa.dtype, buffer=sa_shm.buf)
+        sa[:] = shared_sa
+        del shared_sa
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+    return sa
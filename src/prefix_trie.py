@@ -1,3 +1,10 @@
+import gc
+from itertools import islice
+
+from frozen_trie import FrozenTrie
+from memory_report import MemoryCounter
+
+
 #Create TrieNode class with __slots__ for memory efficiency
 class TrieNode:
     __slots__ = ("children", "is_end")
@@ -7,9 +14,28 @@ class TrieNode:
         self.is_end = False
 
 
-class PrefixTrie:
+# Node with the number of words in its subtree, for PrefixTrie(counted=True)
+class CountedTrieNode(TrieNode):
+    __slots__ = ("count",)
+
     def __init__(self):
-        self.root = TrieNode()
+        super().__init__()
+        self.count = 0
+
+
+class PrefixTrie:
+    # Edges carry one character (the children key), not a node label
+    LABELED_EDGES = False
+
+    def __init__(self, counted: bool = False):
+        """
+        counted=True keeps a word count on every node, updated by insert
+        and delete. It makes count_suffix O(m), enables select(), and lets
+        paginated range_search skip whole subtrees to reach its offset.
+        """
+        self.counted = counted
+        self._node_class = CountedTrieNode if counted else TrieNode
+        self.root = self._node_class()
         self._node_id = 0
         self._node_map = {}
 
@@ -25,13 +51,74 @@ class PrefixTrie:
     def insert(self, word: str) -> None:
         word = self.invert_string(word)
         node = self.root
+        new_node = self._node_class
 
         for char in word:
             if char not in node.children:
-                node.children[char] = TrieNode()
+                node.children[char] = new_node()
             node = node.children[char]
 
-        node.is_end = True
+        if not node.is_end:
+            node.is_end = True
+            if self.counted:
+                for on_path in self._path_nodes(word):
+                    on_path.count += 1
+
+    # -------------------------------
+    # Bulk load (sorted, shared-prefix reuse)
+    # -------------------------------
+    def insert_batch(self, words, pause_gc: bool = True) -> None:
+        """
+        Insert many words in one pass over their sorted inverted forms.
+        Each word starts from the deepest node it shares with the previous
+        one instead of the root, and its new tail is allocated in one go.
+        Into an empty trie no lookups are needed past the shared prefix.
+        pause_gc disables the cyclic GC while the nodes are allocated.
+        """
+        inverted = sorted({self.invert_string(w) for w in words})
+        fresh = not self.root.children and not self.root.is_end
+        new_node = self._node_class
+        counted = self.counted
+
+        gc_was_enabled = gc.isenabled()
+        if pause_gc:
+            gc.disable()
+        try:
+            stack = [self.root]
+            previous = ""
+            for word in inverted:
+                # Longest common prefix with the previous word
+                shared = 0
+                limit = min(len(word), len(previous))
+                while shared < limit and word[shared] == previous[shared]:
+                    shared += 1
+                del stack[shared + 1:]
+
+                node = stack[-1]
+                tail = word[shared:]
+                if fresh:
+                    nodes = [new_node() for _ in tail]
+                    for char, child in zip(tail, nodes):
+                        node.children[char] = child
+                        node = child
+                    stack.extend(nodes)
+                else:
+                    for char in tail:
+                        child = node.children.get(char)
+                        if child is None:
+                            child = node.children[char] = new_node()
+                        stack.append(child)
+                        node = child
+
+                if not node.is_end:
+                    node.is_end = True
+                    if counted:
+                        for on_path in stack:
+                            on_path.count += 1
+                previous = word
+        finally:
+            if pause_gc and gc_was_enabled:
+                gc.enable()
 
     # -------------------------------
     # Search (O(m))
@@ -50,67 +137,265 @@ class PrefixTrie:
     # -------------------------------
     # Range Search (suffix query)
     # -------------------------------
-    def range_search(self, suffix: str):
-        suffix = self.invert_string(suffix)
+    def range_search(self, suffix: str, limit=None, offset: int = 0):
+        if self.counted and offset:
+            node, path = self._locate(self.invert_string(suffix))
+            if node is None:
+                return []
+            return list(islice(self._iter_from(node, path, offset), limit))
+
+        if limit is not None or offset:
+            stop = None if limit is None else offset + limit
+            return list(islice(self.iter_range_search(suffix), offset, stop))
+
+        node, path = self._locate(self.invert_string(suffix))
+        if node is None:
+            return []
+        return [path[::-1] for _, path in self._traverse(node, path, ends_only=True)]
+
+    def iter_range_search(self, suffix: str):
+        """Lazily yield range_search(suffix) results, in the same order."""
+        node, path = self._locate(self.invert_string(suffix))
+        if node is not None:
+            for _, path in self._traverse(node, path, ends_only=True):
+                yield path[::-1]
+
+    def count_suffix(self, suffix: str) -> int:
+        """Number of words ending with suffix, without building them."""
+        node, _ = self._locate(self.invert_string(suffix))
+        if node is None:
+            return 0
+        if self.counted:
+            return node.count
+        return sum(1 for _ in self._traverse(node, ends_only=True))
+
+    # -------------------------------
+    # Rank / select (counted tries)
+    # -------------------------------
+    def select(self, k: int, suffix: str = "") -> str:
+        """
+        The k-th (0-based) word ending with suffix, in lexicographic order
+        of the inverted words. Descends one level at a time, skipping
+        children whose whole subtree comes before k: O(m * sigma).
+        """
+        if not self.counted:
+            raise ValueError("select() requires PrefixTrie(counted=True)")
+
+        node, path = self._locate(self.invert_string(suffix))
+        if node is None or not 0 <= k < node.count:
+            raise IndexError("select index out of range")
+
+        while True:
+            if node.is_end:
+                if k == 0:
+                    return path[::-1]
+                k -= 1
+            children = node.children
+            for char in sorted(children):
+                child = children[char]
+                if k < child.count:
+                    break
+                k -= child.count
+            path += self._edge_label(char, child)
+            node = child
+
+    def _iter_from(self, node, path, offset: int):
+        """
+        Words below node in range_search order, starting at offset. Whole
+        subtrees before the offset are skipped by their counts, so only
+        the path down to the first wanted word is walked.
+        """
+        edge_label = self._edge_label
+        stack = [(node, path)]
+        pop, push = stack.pop, stack.append
+        while stack:
+            node, path = pop()
+            if offset >= node.count:
+                offset -= node.count
+                continue
+            if node.is_end:
+                if offset:
+                    offset -= 1
+                else:
+                    yield path[::-1]
+            for char, child in reversed(node.children.items()):
+                push((child, path + edge_label(char, child)))
+
+    def _find_node(self, inverted: str):
+        """Node reached by walking an inverted string, or None."""
         node = self.root
+        for char in inverted:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
 
-        for char in suffix:
-            if char not in node.children:
-                return []
+    def _locate(self, inverted: str):
+        """
+        Node whose subtree holds the words starting with an inverted
+        string, and that node's full inverted path; (None, None) if none.
+        """
+        node = self._find_node(inverted)
+        return (node, inverted) if node is not None else (None, None)
+
+    def _path_nodes(self, inverted: str):
+        """Nodes from the root down to an existing inverted word."""
+        node = self.root
+        nodes = [node]
+        for char in inverted:
             node = node.children[char]
+            nodes.append(node)
+        return nodes
+
+    @staticmethod
+    def _edge_label(char, child) -> str:
+        """Characters on the edge to child (one per edge in this trie)."""
+        return char
+
+    # -------------------------------
+    # Traversal engine (explicit stack, no recursion)
+    # -------------------------------
+    def _traverse(self, node, path=None, ends_only: bool = False):
+        """
+        Yield (node, path) for node and everything below it, in preorder
+        with children in insertion order. path is the inverted string
+        spelled up to each node, extended from the given start path; with
+        path=None no strings are built and None is yielded instead.
+        ends_only skips nodes that don't end a word.
+        """
+        if path is None:
+            stack = [node]
+            pop, extend = stack.pop, stack.extend
+            while stack:
+                node = pop()
+                if node.is_end or not ends_only:
+                    yield node, None
+                extend(reversed(node.children.values()))
+            return
+
+        stack = [(node, path)]
+        pop, push = stack.pop, stack.append
+        if self.LABELED_EDGES:
+            while stack:
+                node, path = pop()
+                if node.is_end or not ends_only:
+                    yield node, path
+                for child in reversed(node.children.values()):
+                    push((child, path + child.label))
+
+        else:
+            while stack:
+                node, path = pop()
+
+                # Follow single-child chains without going through the stack
+                while True:
+                    if node.is_end or not ends_only:
+                        yield node, path
+                    children = node.children
+                    if len(children) != 1:
+                        break
+                    for char, node in children.items():
+                        path += char
+
+                for char, child in reversed(children.items()):
+                    push((child, path + char))
 
+    # -------------------------------
+    # Batched queries
+    # -------------------------------
+    def search_many(self, patterns):
+        """
+        search() for a batch of patterns, results in input order.
+        One tight loop over the batch, without a method call per pattern.
+        """
+        root = self.root
         results = []
-        self._collect(node, list(suffix), results)
+        for pattern in patterns:
+            node = root
+            for char in reversed(pattern):
+                node = node.children.get(char)
+                if node is None:
+                    break
+            results.append(node is not None and node.is_end)
         return results
 
-    def _collect(self, node, path, results):
-        if node.is_end:
-            results.append("".join(path)[::-1])
+    def range_search_many(self, suffixes):
+        """
+        range_search() for a batch of suffixes, results in input order.
+        Repeated suffixes in the batch are walked and collected only once.
+        """
+        seen = {}
+        results = []
+        for suffix in suffixes:
+            if suffix in seen:
+                results.append(list(seen[suffix]))
+            else:
+                seen[suffix] = self.range_search(suffix)
+                results.append(seen[suffix])
+        return results
 
-        for char, child in node.children.items():
-            path.append(char)
-            self._collect(child, path, results)
-            path.pop()
+    # -------------------------------
+    # Freeze into a read-only array trie
+    # -------------------------------
+    def freeze(self) -> FrozenTrie:
+        """
+        Immutable, NumPy-backed copy of this trie (double-array layout)
+        with the same search / range_search semantics. Range results come
+        back sorted by inverted word rather than in insertion order.
+        """
+        return FrozenTrie(self.root)
 
     # -------------------------------
     # Delete (O(m))
     # -------------------------------
     def delete(self, word: str) -> None:
         word = self.invert_string(word)
-        self._delete_recursive(self.root, word, 0)
-
-    def _delete_recursive(self, node, word, depth):
-        if depth == len(word):
-            if not node.is_end:
-                return False
-            node.is_end = False
-            return len(node.children) == 0
-
-        char = word[depth]
-        if char not in node.children:
-            return False
+        node = self.root
+        parents = []
 
-        should_delete = self._delete_recursive(
-            node.children[char], word, depth + 1
-        )
+        for char in word:
+            child = node.children.get(char)
+            if child is None:
+                return
+            parents.append(node)
+            node = child
 
-        if should_delete:
-            del node.children[char]
-            return not node.is_end and len(node.children) == 0
+        if not node.is_end:
+            return
+        node.is_end = False
+        if self.counted:
+            for on_path in parents + [node]:
+                on_path.count -= 1
 
-        return False
+        # Prune the now-unused tail of the path, bottom-up
+        for char, parent in zip(reversed(word), reversed(parents)):
+            if node.is_end or node.children:
+                break
+            del parent.children[char]
+            node = parent
 
     # -------------------------------
     # Memory usage (node count)
     # -------------------------------
     def memory_usage(self) -> int:
-        return self._count_nodes(self.root)
+        return sum(1 for _ in self._traverse(self.root))
 
-    def _count_nodes(self, node) -> int:
-        count = 1
-        for child in node.children.values():
-            count += self._count_nodes(child)
-        return count
+    def memory_report(self) -> dict:
+        """
+        Real bytes per component, from one iterative walk: node objects,
+        child dicts, their keys, plus edge labels (RadixTrie) and subtree
+        counts (counted tries).
+        """
+        counter = MemoryCounter()
+        nodes = [node for node, _ in self._traverse(self.root)]
+        counter.add_objects("nodes", nodes)
+        counter.add_objects("child_dicts", (node.children for node in nodes))
+        counter.add_objects("keys", (char for node in nodes for char in node.children))
+        if self.LABELED_EDGES:
+            counter.add_objects("labels", (node.label for node in nodes))
+        if self.counted:
+            counter.add_objects("counts", (node.count for node in nodes))
+        return counter.report()
 
     # -------------------------------
     # GraphViz visualization
@@ -120,22 +405,221 @@ class PrefixTrie:
         self._node_map = {}
         lines = ["digraph Trie {", "node [shape=circle];"]
 
-        self._graphviz_dfs(self.root, lines)
+        # Preorder ids first, then one line per end node and per edge
+        nodes = [node for node, _ in self._traverse(self.root)]
+        for node in nodes:
+            self._node_map[id(node)] = self._node_id
+            self._node_id += 1
+
+        for node in nodes:
+            current_id = self._node_map[id(node)]
+            if node.is_end:
+                lines.append(f'{current_id} [shape=doublecircle];')
+            for char, child in node.children.items():
+                child_id = self._node_map[id(child)]
+                label = self._edge_label(char, child)
+                lines.append(f'{current_id} -> {child_id} [label="{label}"];')
 
         lines.append("}")
         with open(filename, "w") as f:
             f.write("\n".join(lines))
 
-    def _graphviz_dfs(self, node, lines):
-        current_id = self._node_id
-        self._node_map[id(node)] = current_id
-        self._node_id += 1
 
-        if node.is_end:
-            lines.append(f'{current_id} [shape=doublecircle];')
+# -------------------------------
+# Radix (path-compressed) trie
+# -------------------------------
+class RadixNode:
+    __slots__ = ("label", "children", "is_end")
+
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.children = {}
+        self.is_end = False
+
+
+class CountedRadixNode(RadixNode):
+    __slots__ = ("count",)
+
+    def __init__(self, label: str = ""):
+        super().__init__(label)
+        self.count = 0
+
+
+class RadixTrie(PrefixTrie):
+    """
+    PrefixTrie with path compression: every edge carries a string label
+    and chains of single-child nodes are collapsed into one edge.
+    children still maps the first character of each edge to its node.
+    Inserts split edges where a new word diverges mid-label, and deletes
+    merge a node back into its only child.
+    """
+
+    LABELED_EDGES = True
+
+    def __init__(self, counted: bool = False):
+        super().__init__(counted)
+        self._node_class = CountedRadixNode if counted else RadixNode
+        self.root = self._node_class()
+
+    # -------------------------------
+    # Insert (O(m), split on divergence)
+    # -------------------------------
+    def insert(self, word: str) -> None:
+        word = self.invert_string(word)
+        node = self.root
+        i = 0
+
+        while i < len(word):
+            child = node.children.get(word[i])
+            if child is None:
+                child = self._node_class(word[i:])
+                node.children[word[i]] = child
+
+            label = child.label
+            if not word.startswith(label, i):
+                # Split the edge where the word leaves it
+                k = 1
+                while i + k < len(word) and word[i + k] == label[k]:
+                    k += 1
+                middle = self._node_class(label[:k])
+                if self.counted:
+                    middle.count = child.count
+                child.label = label[k:]
+                middle.children[child.label[0]] = child
+                node.children[word[i]] = middle
+                child = middle
+
+            node = child
+            i += len(child.label)
+
+        if not node.is_end:
+            node.is_end = True
+            if self.counted:
+                for on_path in self._path_nodes(word):
+                    on_path.count += 1
+
+    def insert_batch(self, words, pause_gc: bool = True) -> None:
+        """
+        Insert many words. Edge splits depend on every word below them,
+        so there is no shared-path shortcut: this is the plain insert
+        loop, with the cyclic GC optionally paused.
+        """
+        gc_was_enabled = gc.isenabled()
+        if pause_gc:
+            gc.disable()
+        try:
+            for word in words:
+                self.insert(word)
+        finally:
+            if pause_gc and gc_was_enabled:
+                gc.enable()
+
+    # -------------------------------
+    # Search (O(m))
+    # -------------------------------
+    def search(self, pattern: str) -> bool:
+        pattern = self.invert_string(pattern)
+        node = self.root
+        i = 0
+
+        while i < len(pattern):
+            node = node.children.get(pattern[i])
+            if node is None or not pattern.startswith(node.label, i):
+                return False
+            i += len(node.label)
+
+        return node.is_end
+
+    def search_many(self, patterns):
+        search = self.search
+        return [search(p) for p in patterns]
+
+    # -------------------------------
+    # Range search helpers
+    # -------------------------------
+    def _locate(self, inverted: str):
+        """
+        The pattern may end inside an edge label; the node below that
+        edge then holds all the matches, and its path extends the pattern.
+        """
+        node = self.root
+        i = 0
+
+        while i < len(inverted):
+            child = node.children.get(inverted[i])
+            if child is None:
+                return None, None
+            label = child.label
+            if len(inverted) - i <= len(label):
+                if label.startswith(inverted[i:]):
+                    return child, inverted[:i] + label
+                return None, None
+            if not inverted.startswith(label, i):
+                return None, None
+            node = child
+            i += len(label)
+
+        return node, inverted
+
+    def _find_node(self, inverted: str):
+        return self._locate(inverted)[0]
 
-        for char, child in node.children.items():
-            child_id = self._node_id
-            self._graphviz_dfs(child, lines)
-            lines.append(f'{current_id} -> {child_id} [label="{char}"];')
+    def _path_nodes(self, inverted: str):
+        node = self.root
+        nodes = [node]
+        i = 0
+        while i < len(inverted):
+            node = node.children[inverted[i]]
+            nodes.append(node)
+            i += len(node.label)
+        return nodes
+
+    @staticmethod
+    def _edge_label(char, child) -> str:
+        return child.label
 
+    # -------------------------------
+    # Delete (O(m), merge single-child nodes)
+    # -------------------------------
+    def delete(self, word: str) -> None:
+        word = self.invert_string(word)
+        node = self.root
+        parents = []
+        i = 0
+
+        while i < len(word):
+            child = node.children.get(word[i])
+            if child is None or not word.startswith(child.label, i):
+                return
+            parents.append(node)
+            node = child
+            i += len(child.label)
+
+        if not node.is_end:
+            return
+        node.is_end = False
+        if self.counted:
+            for on_path in parents + [node]:
+                on_path.count -= 1
+
+        if not parents:
+            return
+        parent = parents[-1]
+        if not node.children:
+            del parent.children[node.label[0]]
+            node = parent
+        # A non-root node left with one child and no word merges into it
+        if node is not self.root and not node.is_end and len(node.children) == 1:
+            (child,) = node.children.values()
+            node.label += child.label
+            node.children = child.children
+            node.is_end = child.is_end
+
+    # -------------------------------
+    # Freeze (expands the labels into a per-character trie first)
+    # -------------------------------
+    def freeze(self) -> FrozenTrie:
+        trie = PrefixTrie()
+        for word in self.iter_range_search(""):
+            trie.insert(word)
+        return trie.freeze()
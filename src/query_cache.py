@@ -0,0 +1,190 @@
+import sys
+from collections import OrderedDict
+
+INVALIDATIONS = ("generation", "prefix")
+
+
+class CachedIndex:
+    """
+    LRU cache of range_search / count_suffix results in front of any
+    index structure (PrefixTrie, RadixTrie, InvertedSuffixArray, ...).
+
+    The cache is bounded by max_entries and, optionally, by max_bytes of
+    cached results (getsizeof of the list and its strings); the least
+    recently used entries are evicted first.
+
+    range_search caches the full match list per suffix; limit / offset
+    pages are sliced from it, so every page of a suffix shares one entry.
+
+    invalidation="generation": every insert / delete bumps a generation
+    counter and entries from older generations count as misses.
+    invalidation="prefix": an update to word only drops the count_suffix
+    entries whose suffix is a suffix of word, i.e. whose inverted pattern
+    is a prefix of the inverted word. Match lists still follow the
+    generation: on backends that buffer writes (mutable
+    InvertedSuffixArray, SortedWordArray) an unrelated insert can trigger
+    a merge that reorders every list.
+    """
+
+    def __init__(
+        self,
+        structure,
+        max_entries: int = 1024,
+        max_bytes=None,
+        invalidation: str = "prefix",
+    ):
+        if invalidation not in INVALIDATIONS:
+            raise ValueError(
+                f"Unknown invalidation {invalidation!r}; expected one of {list(INVALIDATIONS)}"
+            )
+        self.structure = structure
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.invalidation = invalidation
+        self.generation = 0
+
+        # key -> (generation, value, size), least recently used first
+        self._entries = OrderedDict()
+        # suffix -> keys cached for it (prefix invalidation)
+        self._keys_by_suffix = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    # -------------------------------
+    # Queries (cached)
+    # -------------------------------
+    def range_search(self, suffix: str, limit=None, offset: int = 0):
+        key = ("range_search", suffix)
+        value = self._get(key)
+        if value is None:
+            value = self.structure.range_search(suffix)
+            self._put(key, suffix, value)
+        return value[offset:None if limit is None else offset + limit]
+
+    def range_search_many(self, suffixes):
+        range_search = self.range_search
+        return [range_search(s) for s in suffixes]
+
+    def count_suffix(self, suffix: str) -> int:
+        key = ("count_suffix", suffix)
+        value = self._get(key)
+        if value is None:
+            value = self.structure.count_suffix(suffix)
+            self._put(key, suffix, value)
+        return value
+
+    # -------------------------------
+    # Queries (passed through)
+    # -------------------------------
+    def search(self, pattern: str) -> bool:
+        return self.structure.search(pattern)
+
+    def search_many(self, patterns):
+        return self.structure.search_many(patterns)
+
+    def memory_usage(self) -> int:
+        return self.structure.memory_usage()
+
+    # -------------------------------
+    # Updates (invalidate)
+    # -------------------------------
+    def insert(self, word: str) -> None:
+        self.structure.insert(word)
+        self._invalidate([word])
+
+    def insert_batch(self, words) -> None:
+        words = list(words)
+        self.structure.insert_batch(words)
+        self._invalidate(words)
+
+    def delete(self, word: str) -> None:
+        self.structure.delete(word)
+        self._invalidate([word])
+
+    def _invalidate(self, words) -> None:
+        self.generation += 1
+        if self.invalidation == "generation":
+            # Older entries now miss; they are dropped when looked up or evicted
+            return
+        if len(words) > len(self._entries):
+            self.clear()
+            return
+
+        by_suffix = self._keys_by_suffix
+        for word in words:
+            for start in range(len(word) + 1):
+                keys = by_suffix.get(word[start:])
+                if keys:
+                    for key in list(keys):
+                        self._remove(key)
+                        self.invalidations += 1
+
+    # -------------------------------
+    # LRU bookkeeping
+    # -------------------------------
+    def _get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            # Counts are exact under prefix invalidation, match lists are not
+            if entry[0] == self.generation or (
+                self.invalidation == "prefix" and key[0] == "count_suffix"
+            ):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self._remove(key)
+            self.invalidations += 1
+        self.misses += 1
+        return None
+
+    def _put(self, key, suffix: str, value) -> None:
+        size = self._sizeof(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        self._entries[key] = (self.generation, value, size)
+        self._keys_by_suffix.setdefault(suffix, set()).add(key)
+        self.bytes += size
+
+        while len(self._entries) > self.max_entries or (
+            self.max_bytes is not None and self.bytes > self.max_bytes
+        ):
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _remove(self, key) -> None:
+        _, _, size = self._entries.pop(key)
+        self.bytes -= size
+        suffix = key[1]
+        keys = self._keys_by_suffix[suffix]
+        keys.discard(key)
+        if not keys:
+            del self._keys_by_suffix[suffix]
+
+    @staticmethod
+    def _sizeof(value) -> int:
+        if isinstance(value, list):
+            return sys.getsizeof(value) + sum(sys.getsizeof(w) for w in value)
+        return sys.getsizeof(value)
+
+    def clear(self) -> None:
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+        self._keys_by_suffix.clear()
+        self.bytes = 0
+
+    def stats(self) -> dict:
+        """Counters for sizing the cache."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "generation": self.generation,
+        }
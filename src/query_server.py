@@ -0,0 +1,361 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Protocol: JSON lines over TCP or a Unix socket. Each request is one
+# object {"id", "op", "pattern"[, "limit", "offset"]}; each response is
+# {"id", "result"} or {"id", "error"}, in request order per connection.
+OPS = ("search", "range_search", "count_suffix", "insert", "delete")
+MAX_LINE = 1 << 20
+
+
+class QueryServer:
+    """
+    asyncio front-end for any index structure (PrefixTrie, RadixTrie,
+    InvertedSuffixArray, FMIndex, ...).
+
+    Requests from all connections go into one bounded queue. A batcher
+    waits batch_window seconds after the first request, takes up to
+    max_batch of them, and runs them on a single worker thread, so the
+    structure is only ever touched by one thread and the event loop keeps
+    accepting requests meanwhile. Consecutive search / range_search
+    requests in a batch are answered by one search_many /
+    range_search_many call.
+
+    Backpressure: a connection stops being read once it has max_inflight
+    unanswered requests or the shared queue holds max_pending, and
+    responses wait for the socket to drain.
+    """
+
+    def __init__(
+        self,
+        structure,
+        batch_window: float = 0.001,
+        max_batch: int = 256,
+        max_pending: int = 4096,
+        max_inflight: int = 128,
+    ):
+        self.structure = structure
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self.max_inflight = max_inflight
+        self.stats = {"requests": 0, "batches": 0, "largest_batch": 0, "errors": 0}
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._server = None
+        self._batcher = None
+        self._queue = None
+        self._connections = {}
+        self._thread = None
+        self._loop = None
+
+    # -------------------------------
+    # Lifecycle
+    # -------------------------------
+    async def start(self, host: str = "127.0.0.1", port: int = 0, path=None):
+        """Listen on host:port, or on the Unix socket at path if given."""
+        self._queue = asyncio.Queue(self.max_pending)
+        self._batcher = asyncio.create_task(self._batch_loop())
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._handle, path=path, limit=MAX_LINE)
+        else:
+            self._server = await asyncio.start_server(self._handle, host, port, limit=MAX_LINE)
+        return self.address
+
+    @property
+    def address(self):
+        """(host, port) for TCP, the socket path for a Unix socket."""
+        return self._server.sockets[0].getsockname()
+
+    async def serve_forever(self) -> None:
+        await self._server.serve_forever()
+
+    async def close(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+        # Closed sockets end the connection handlers; the batcher is still
+        # running, so their queued requests are answered first
+        for writer in self._connections.values():
+            writer.close()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        self._batcher.cancel()
+        self._executor.shutdown(wait=True)
+
+    def start_in_thread(self, host: str = "127.0.0.1", port: int = 0, path=None):
+        """Run the server on its own event loop thread; returns the address."""
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.start(host, port, path))
+            ready.set()
+            self._loop.run_forever()
+            self._loop.run_until_complete(self.close())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self.address
+
+    def stop_thread(self) -> None:
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    # -------------------------------
+    # Connections
+    # -------------------------------
+    async def _handle(self, reader, writer) -> None:
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        task.add_done_callback(self._connections.pop)
+        loop = asyncio.get_running_loop()
+        inflight = asyncio.Semaphore(self.max_inflight)
+        responses = asyncio.Queue()
+        sender = asyncio.create_task(self._send_loop(writer, responses, inflight))
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):
+                    break
+                if not line:
+                    break
+                await inflight.acquire()
+
+                future = loop.create_future()
+                # Stays None only if the line is not a JSON object
+                request_id = None
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("request must be a JSON object")
+                    request_id = request.get("id")
+                    call = self._parse(request)
+                except (ValueError, TypeError) as exc:
+                    future.set_exception(ValueError(f"Bad request: {exc}"))
+                else:
+                    await self._queue.put((call, future))
+                responses.put_nowait((request_id, future))
+        finally:
+            responses.put_nowait(None)
+            await sender
+            writer.close()
+
+    @staticmethod
+    def _parse(request):
+        op = request.get("op")
+        if op not in OPS:
+            raise ValueError(f"unknown op {op!r}; expected one of {list(OPS)}")
+        pattern = request.get("pattern")
+        if not isinstance(pattern, str):
+            raise ValueError("pattern must be a string")
+        limit = request.get("limit")
+        if limit is not None and not QueryServer._is_count(limit):
+            raise ValueError("limit must be null or a non-negative integer")
+        offset = request.get("offset", 0)
+        if not QueryServer._is_count(offset):
+            raise ValueError("offset must be a non-negative integer")
+        return op, pattern, limit, offset
+
+    @staticmethod
+    def _is_count(value) -> bool:
+        # JSON true / false decode to bool, which is an int subclass
+        return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+    async def _send_loop(self, writer, responses, inflight) -> None:
+        """Write responses in request order, waiting for the socket to drain."""
+        while True:
+            item = await responses.get()
+            if item is None:
+                return
+            request_id, future = item
+            try:
+                response = {"id": request_id, "result": await future}
+            except Exception as exc:
+                self.stats["errors"] += 1
+                response = {"id": request_id, "error": str(exc)}
+            try:
+                writer.write(json.dumps(response).encode("utf-8") + b"\n")
+                await writer.drain()
+            except ConnectionError:
+                pass
+            inflight.release()
+
+    # -------------------------------
+    # Micro-batching
+    # -------------------------------
+    async def _batch_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            if self.batch_window > 0:
+                await asyncio.sleep(self.batch_window)
+            while len(batch) < self.max_batch and not queue.empty():
+                batch.append(queue.get_nowait())
+
+            self.stats["requests"] += len(batch)
+            self.stats["batches"] += 1
+            self.stats["largest_batch"] = max(self.stats["largest_batch"], len(batch))
+
+            calls = [call for call, _ in batch]
+            outcomes = await loop.run_in_executor(self._executor, self._execute, calls)
+            for (_, future), (error, value) in zip(batch, outcomes):
+                if future.cancelled():
+                    continue
+                if error is None:
+                    future.set_result(value)
+                else:
+                    future.set_exception(error)
+
+    def _execute(self, calls):
+        """
+        Run one batch in order, as (error, value) pairs. Runs of plain
+        search / range_search calls go through the structure's batch APIs.
+        """
+        outcomes = []
+        i = 0
+        while i < len(calls):
+            j = i + 1
+            if self._batchable(calls[i]):
+                while j < len(calls) and calls[j][0] == calls[i][0] and self._batchable(calls[j]):
+                    j += 1
+            run = calls[i:j]
+            try:
+                outcomes.extend((None, value) for value in self._run(run))
+            except Exception as exc:
+                outcomes.extend((exc, None) for _ in run)
+            i = j
+        return outcomes
+
+    def _batchable(self, call) -> bool:
+        op, _, limit, offset = call
+        if op == "search":
+            return hasattr(self.structure, "search_many")
+        if op == "range_search":
+            return limit is None and not offset and hasattr(self.structure, "range_search_many")
+        return False
+
+    def _run(self, run):
+        structure = self.structure
+        op = run[0][0]
+        if len(run) > 1 and op == "search":
+            return structure.search_many([pattern for _, pattern, _, _ in run])
+        if len(run) > 1 and op == "range_search":
+            return structure.range_search_many([pattern for _, pattern, _, _ in run])
+
+        (op, pattern, limit, offset), = run
+        if op == "range_search":
+            return [structure.range_search(pattern, limit=limit, offset=offset)]
+        return [getattr(structure, op)(pattern)]
+
+
+# -------------------------------
+# Load generator
+# -------------------------------
+async def run_load(
+    patterns,
+    host: str = "127.0.0.1",
+    port=None,
+    path=None,
+    op: str = "search",
+    connections: int = 16,
+    requests: int = 10000,
+) -> dict:
+    """
+    Closed-loop load: each connection sends one request and waits for its
+    response before the next, cycling through patterns. Reports QPS and
+    latency percentiles.
+    """
+    latencies = []
+    sent = 0
+
+    async def client():
+        nonlocal sent
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path, limit=MAX_LINE)
+        else:
+            reader, writer = await asyncio.open_connection(host, port, limit=MAX_LINE)
+        while sent < requests:
+            pattern = patterns[sent % len(patterns)]
+            request = {"id": sent, "op": op, "pattern": pattern}
+            sent += 1
+            start_time = time.perf_counter()
+            writer.write(json.dumps(request).encode("utf-8") + b"\n")
+            await writer.drain()
+            response = json.loads(await reader.readline())
+            latencies.append(time.perf_counter() - start_time)
+            if "error" in response:
+                raise RuntimeError(response["error"])
+        writer.close()
+        await writer.wait_closed()
+
+    start_time = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(connections)))
+    elapsed = time.perf_counter() - start_time
+
+    latencies.sort()
+    return {
+        "op": op,
+        "connections": connections,
+        "requests": len(latencies),
+        "duration_sec": elapsed,
+        "qps": len(latencies) / elapsed,
+        "p50_sec": latencies[len(latencies) // 2],
+        "p99_sec": latencies[int(len(latencies) * 0.99)],
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    import random
+
+    from prefix_trie import PrefixTrie, RadixTrie
+    from suffix_array import InvertedSuffixArray
+    from fm_index import FMIndex
+
+    STRUCTURES = {
+        "prefix_trie": PrefixTrie,
+        "radix_trie": RadixTrie,
+        "suffix_array": InvertedSuffixArray,
+        "fm_index": FMIndex,
+    }
+
+    parser = argparse.ArgumentParser(description="Serve an index or load-test a server")
+    parser.add_argument("mode", choices=("serve", "load"))
+    parser.add_argument("--dataset", default="datasets/large.txt")
+    parser.add_argument("--structure", choices=sorted(STRUCTURES), default="suffix_array")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", default=None, help="Unix socket path instead of TCP")
+    parser.add_argument("--batch-window", type=float, default=0.001)
+    parser.add_argument("--op", choices=OPS[:3], default="search")
+    parser.add_argument("--connections", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=10000)
+    args = parser.parse_args()
+
+    with open(args.dataset) as f:
+        words = [line.strip() for line in f if line.strip()]
+
+    if args.mode == "serve":
+        structure = STRUCTURES[args.structure]()
+        structure.insert_batch(words)
+        server = QueryServer(structure, batch_window=args.batch_window)
+
+        async def main():
+            address = await server.start(args.host, args.port, args.unix)
+            print(f"Serving {args.structure} ({len(words)} words) on {address}")
+            await server.serve_forever()
+
+        asyncio.run(main())
+    else:
+        # Suffixes of random words, so searches and range searches hit
+        patterns = [w[-random.randint(1, len(w)):] for w in random.choices(words, k=1000)]
+        report = asyncio.run(run_load(
+            patterns, args.host, args.port, args.unix,
+            op=args.op, connections=args.connections, requests=args.requests,
+        ))
+        print(json.dumps(report, indent=4))
@@ -0,0 +1,336 @@
+import numpy as np
+
+
+# -------------------------------
+# Integer coding
+# -------------------------------
+SENTINEL = 0
+
+
+def encode_words(words):
+    """
+    Encode words as one compact code array, each word followed by a shared
+    SENTINEL (0). Characters are coded 1..sigma in code point order, so
+    comparing codes orders strings exactly like comparing the strings.
+
+    Returns:
+        codes: uint8/uint16/uint32 array (narrowest that fits the alphabet)
+        word_starts: int64 offsets of every word, plus len(codes) at the end
+        alphabet: str of the distinct characters, alphabet[c - 1] has code c
+    """
+    lengths = np.fromiter((len(w) for w in words), dtype=np.int64,
+                          count=len(words))
+    word_starts = np.concatenate(([0], np.cumsum(lengths + 1)))
+
+    points = np.frombuffer("".join(words).encode("utf-32-le"), dtype=np.uint32)
+    alphabet_points = np.unique(points)
+    sigma = len(alphabet_points)
+    if sigma < 0xFF:
+        dtype = np.uint8
+    elif sigma < 0xFFFF:
+        dtype = np.uint16
+    else:
+        dtype = np.uint32
+
+    codes = np.full(int(word_starts[-1]), SENTINEL, dtype=dtype)
+    is_char = np.ones(len(codes), dtype=bool)
+    is_char[word_starts[1:] - 1] = False
+    codes[is_char] = np.searchsorted(alphabet_points, points) + 1
+
+    alphabet = "".join(map(chr, alphabet_points.tolist()))
+    return codes, word_starts, alphabet
+
+
+def decode_table(alphabet: str):
+    """
+    Code -> code point table for decode_words. The sentinel maps to some
+    character outside the alphabet, returned as the separator.
+    """
+    used = set(alphabet)
+    separator = next(chr(c) for c in range(1, 0xD800) if chr(c) not in used)
+    points = np.array([ord(separator)] + [ord(ch) for ch in alphabet],
+                      dtype=np.uint32)
+    return points, separator
+
+
+def decode_words(codes, alphabet: str, table=None):
+    """
+    Inverse of encode_words: split a code buffer back into its words.
+    Callers decoding repeatedly can pass a cached decode_table(alphabet).
+    """
+    if len(codes) == 0:
+        return []
+
+    points, separator = table or decode_table(alphabet)
+    text = points[np.asarray(codes)].tobytes().decode("utf-32-le")
+    return text.split(separator)[:-1]
+
+
+def sentinel_ranks(codes, word_starts) -> np.ndarray:
+    """
+    Construction ranks for a sentinel-separated text: the sentinel ending
+    word i gets rank i and character c gets rank n_words + c. Every
+    sentinel is then unique and smaller than any character, so suffixes
+    are ordered by their word-local string first, then by word id, and
+    comparisons never run past the end of a word.
+    """
+    n_words = len(word_starts) - 1
+    ranks = np.asarray(codes).astype(np.int64) + n_words
+    ranks[word_starts[1:] - 1] = np.arange(n_words)
+    return ranks
+
+
+def _dense_ranks(codes) -> np.ndarray:
+    """Map codes to dense ranks 0..sigma-1, preserving their order."""
+    _, ranks = np.unique(np.asarray(codes), return_inverse=True)
+    return ranks.astype(np.int64).reshape(-1)
+
+
+# -------------------------------
+# Prefix doubling (NumPy vectorized, O(n log n) per round)
+# -------------------------------
+def prefix_doubling(codes) -> np.ndarray:
+    """
+    Manber-Myers prefix doubling: after round k every suffix is ranked by
+    its first 2^k characters. Each round is a single vectorized sort of
+    (rank[i], rank[i + k]) pairs, and it stops as soon as all ranks are
+    distinct, so texts with short repeats finish in a few rounds.
+    """
+    n = len(codes)
+    if n == 0:
+        return np.array([], dtype=np.int32)
+
+    rank = _dense_ranks(codes)
+    k = 1
+    while True:
+        # Rank of the suffix k positions ahead (-1 past the end -> 0 here)
+        second = np.zeros(n, dtype=np.int64)
+        if k < n:
+            second[:n - k] = rank[k:] + 1
+
+        # Pack the pair into one int64 key: rank < n and second <= n
+        key = rank * (n + 1) + second
+        sa = np.argsort(key, kind="stable")
+
+        sorted_key = key[sa]
+        new_rank = np.empty(n, dtype=np.int64)
+        new_rank[sa] = np.concatenate(
+            ([0], np.cumsum(sorted_key[1:] != sorted_key[:-1]))
+        )
+        rank = new_rank
+
+        if rank[sa[-1]] == n - 1 or k >= n:
+            return sa.astype(np.int32)
+        k *= 2
+
+
+# -------------------------------
+# SA-IS (linear time, induced sorting)
+# -------------------------------
+def sa_is(codes) -> np.ndarray:
+    """
+    SA-IS suffix array construction (Nong, Zhang & Chan), O(n) time.
+    """
+    ranks = _dense_ranks(codes)
+    if len(ranks) == 0:
+        return np.array([], dtype=np.int32)
+    upper = int(ranks.max())
+    return np.array(_sa_is(ranks.tolist(), upper), dtype=np.int32)
+
+
+def _sa_is(s, upper):
+    n = len(s)
+    if n == 0:
+        return []
+    if n == 1:
+        return [0]
+    if n == 2:
+        return [0, 1] if s[0] < s[1] else [1, 0]
+
+    sa = [0] * n
+
+    # Classify each position as S-type (True) or L-type (False)
+    ls = [False] * n
+    for i in range(n - 2, -1, -1):
+        ls[i] = ls[i + 1] if s[i] == s[i + 1] else s[i] < s[i + 1]
+
+    # Bucket boundaries: sum_l[c] is the start of c's L-bucket,
+    # sum_s[c] is the start of c's S-bucket
+    sum_l = [0] * (upper + 1)
+    sum_s = [0] * (upper + 1)
+    for i in range(n):
+        if not ls[i]:
+            sum_s[s[i]] += 1
+        else:
+            sum_l[s[i] + 1] += 1
+    for i in range(upper + 1):
+        sum_s[i] += sum_l[i]
+        if i < upper:
+            sum_l[i + 1] += sum_s[i]
+
+    def induce(lms):
+        for i in range(n):
+            sa[i] = -1
+
+        buf = sum_s[:]
+        for d in lms:
+            if d == n:
+                continue
+            sa[buf[s[d]]] = d
+            buf[s[d]] += 1
+
+        buf = sum_l[:]
+        sa[buf[s[n - 1]]] = n - 1
+        buf[s[n - 1]] += 1
+        for i in range(n):
+            v = sa[i]
+            if v >= 1 and not ls[v - 1]:
+                sa[buf[s[v - 1]]] = v - 1
+                buf[s[v - 1]] += 1
+
+        buf = sum_l[:]
+        for i in range(n - 1, -1, -1):
+            v = sa[i]
+            if v >= 1 and ls[v - 1]:
+                buf[s[v - 1] + 1] -= 1
+                sa[buf[s[v - 1] + 1]] = v - 1
+
+    # Left-most S positions (LMS) and their order in the text
+    lms_map = [-1] * (n + 1)
+    lms = []
+    for i in range(1, n):
+        if not ls[i - 1] and ls[i]:
+            lms_map[i] = len(lms)
+            lms.append(i)
+    m = len(lms)
+
+    induce(lms)
+
+    if m:
+        # Name the sorted LMS substrings and recurse on the reduced string
+        sorted_lms = [v for v in sa if lms_map[v] != -1]
+        rec_s = [0] * m
+        rec_upper = 0
+        rec_s[lms_map[sorted_lms[0]]] = 0
+        for i in range(1, m):
+            left, right = sorted_lms[i - 1], sorted_lms[i]
+            end_l = lms[lms_map[left] + 1] if lms_map[left] + 1 < m else n
+            end_r = lms[lms_map[right] + 1] if lms_map[right] + 1 < m else n
+            same = True
+            if end_l - left != end_r - right:
+                same = False
+            else:
+                while left < end_l:
+                    if s[left] != s[right]:
+                        break
+                    left += 1
+                    right += 1
+                if left == n or s[left] != s[right]:
+                    same = False
+            if not same:
+                rec_upper += 1
+            rec_s[lms_map[sorted_lms[i]]] = rec_upper
+
+        rec_sa = _sa_is(rec_s, rec_upper)
+        for i in range(m):
+            sorted_lms[i] = lms[rec_sa[i]]
+        induce(sorted_lms)
+
+    return sa
+
+
+# -------------------------------
+# Algorithm registry
+# -------------------------------
+SA_ALGORITHMS = {
+    "doubling": prefix_doubling,
+    "sais": sa_is,
+}
+
+
+def suffix_array_builder(algorithm: str):
+    """The SA_ALGORITHMS builder for algorithm; ValueError if unknown."""
+    try:
+        return SA_ALGORITHMS[algorithm]
+    except KeyError:
+        raise ValueError(
+            f"Unknown suffix array algorithm {algorithm!r}; "
+            f"expected one of {sorted(SA_ALGORITHMS)}"
+        ) from None
+
+
+def build_suffix_array(codes, algorithm: str = "doubling") -> np.ndarray:
+    """
+    Build the exact suffix array of an integer-coded text.
+
+    Args:
+        codes: 1-D integer array (or sequence) of character codes
+        algorithm: one of SA_ALGORITHMS ("doubling" or "sais")
+
+    Returns:
+        int32 NumPy array of suffix start positions in lexicographic order
+    """
+    return suffix_array_builder(algorithm)(codes)
+
+
+# -------------------------------
+# LCP array
+# -------------------------------
+def build_lcp_array(codes, sa) -> np.ndarray:
+    """
+    lcp[i] = length of the longest common prefix of suffixes sa[i - 1]
+    and sa[i] (lcp[0] = 0).
+
+    All adjacent pairs are extended in lock-step, one character per
+    vectorized round, so the number of rounds is the largest LCP value.
+    For word corpora that is bounded by the longest word.
+    """
+    codes = np.asarray(codes)
+    sa = np.asarray(sa, dtype=np.int64)
+    n = len(sa)
+    lcp = np.zeros(n, dtype=np.int32)
+    if n < 2:
+        return lcp
+
+    left = sa[:-1]
+    right = sa[1:]
+    active = np.arange(n - 1)
+    depth = 0
+    while active.size:
+        i = left[active] + depth
+        j = right[active] + depth
+        in_range = (i < n) & (j < n)
+        active, i, j = active[in_range], i[in_range], j[in_range]
+        active = active[codes[i] == codes[j]]
+        depth += 1
+        lcp[active + 1] = depth
+
+    return lcp
+
+
+# -------------------------------
+# Range-minimum queries over the LCP array
+# -------------------------------
+class LcpRmq:
+    """
+    Sparse table over the LCP array: O(n log n) build, O(1) query.
+    """
+
+    def __init__(self, lcp):
+        self.levels = [np.asarray(lcp, dtype=np.int32)]
+        width = 1
+        while 2 * width <= len(lcp):
+            prev = self.levels[-1]
+            self.levels.append(np.minimum(prev[:-width], prev[width:]))
+            width *= 2
+
+    def lcp(self, i: int, j: int) -> int:
+        """LCP of the suffixes at SA ranks i < j: min(lcp[i + 1 .. j])."""
+        lo = i + 1
+        k = (j - lo + 1).bit_length() - 1
+        level = self.levels[k]
+        return int(min(level[lo], level[j - (1 << k) + 1]))
+
+    @property
+    def nbytes(self) -> int:
+        return sum(level.nbytes for level in self.levels)
@@ -0,0 +1,243 @@
+import heapq
+import multiprocessing
+import os
+import threading
+import zlib
+from itertools import islice
+
+from suffix_array import InvertedSuffixArray
+
+PARTITIONS = ("hash", "suffix")
+
+
+def _inverted_key(word: str) -> str:
+    return word[::-1]
+
+
+# -------------------------------
+# Shard worker (runs in its own process)
+# -------------------------------
+def _range_search_sorted(structure, pattern, k):
+    """range_search matches in inverted-word order, at most k of them."""
+    results = sorted(structure.range_search(pattern), key=_inverted_key)
+    return results if k is None else results[:k]
+
+
+def _delete_all(structure, words) -> None:
+    for word in words:
+        structure.delete(word)
+
+
+_SHARD_OPS = {
+    "insert_batch": lambda s, words: s.insert_batch(words),
+    "delete": _delete_all,
+    "search_many": lambda s, patterns: s.search_many(patterns),
+    "range_search": _range_search_sorted,
+    "range_search_many": lambda s, patterns: [
+        sorted(r, key=_inverted_key) for r in s.range_search_many(patterns)
+    ],
+    "count_suffix": lambda s, pattern: s.count_suffix(pattern),
+    "memory_usage": lambda s: s.memory_usage(),
+}
+
+
+def _shard_main(conn, structure_class, options) -> None:
+    structure = structure_class(**options)
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        op, args = message
+        try:
+            conn.send((None, _SHARD_OPS[op](structure, *args)))
+        except Exception as exc:
+            conn.send((exc, None))
+    conn.close()
+
+
+# -------------------------------
+# Sharded index (routing + scatter-gather)
+# -------------------------------
+class ShardedIndex:
+    """
+    Words partitioned across worker processes, one index structure per
+    process, so queries on different shards run on different cores.
+
+    partition="hash" places a word by a CRC of the whole word, which
+    balances shards but sends every range_search to all of them.
+    partition="suffix" places it by the first prefix_len characters of
+    the inverted word (its last characters), so a range_search whose
+    suffix has at least prefix_len characters touches one shard only.
+
+    insert / delete / search go to the owning shard. range_search is
+    sent to all relevant shards at once and their answers are merged in
+    inverted-word order (the suffix array's order), which makes limit /
+    offset pages consistent for every backend. Calls from several threads
+    are safe; each shard serves one request at a time.
+    """
+
+    def __init__(
+        self,
+        shards=None,
+        structure_class=InvertedSuffixArray,
+        partition: str = "hash",
+        prefix_len: int = 2,
+        **options,
+    ):
+        if partition not in PARTITIONS:
+            raise ValueError(
+                f"Unknown partition {partition!r}; expected one of {list(PARTITIONS)}"
+            )
+        self.shards = shards or os.cpu_count() or 1
+        self.partition = partition
+        self.prefix_len = prefix_len
+
+        self._conns = []
+        self._locks = []
+        self._processes = []
+        for _ in range(self.shards):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_shard_main, args=(child, structure_class, options), daemon=True
+            )
+            process.start()
+            child.close()
+            self._conns.append(parent)
+            self._locks.append(threading.Lock())
+            self._processes.append(process)
+
+    # -------------------------------
+    # Routing
+    # -------------------------------
+    def shard_of(self, word: str) -> int:
+        if self.partition == "hash":
+            key = word
+        else:
+            key = word[:-self.prefix_len - 1:-1]
+        return zlib.crc32(key.encode("utf-8")) % self.shards
+
+    def _shards_for_suffix(self, suffix: str):
+        """Shards that can hold words ending with suffix."""
+        if self.partition == "suffix" and len(suffix) >= self.prefix_len:
+            return [self.shard_of(suffix)]
+        return range(self.shards)
+
+    def _group(self, words):
+        """Positions of words per owning shard."""
+        groups = {}
+        for i, word in enumerate(words):
+            groups.setdefault(self.shard_of(word), []).append(i)
+        return groups
+
+    def _scatter(self, requests):
+        """
+        Send {shard: (op, args)} to every shard first, then collect the
+        answers, so the shards work in parallel. Locks are taken in shard
+        order, which keeps concurrent callers from deadlocking.
+        """
+        shards = sorted(requests)
+        for shard in shards:
+            self._locks[shard].acquire()
+        try:
+            for shard in shards:
+                self._conns[shard].send(requests[shard])
+            replies = {shard: self._conns[shard].recv() for shard in shards}
+        finally:
+            for shard in shards:
+                self._locks[shard].release()
+
+        for error, _ in replies.values():
+            if error is not None:
+                raise error
+        return {shard: result for shard, (_, result) in replies.items()}
+
+    # -------------------------------
+    # Updates
+    # -------------------------------
+    def insert(self, word: str) -> None:
+        self.insert_batch([word])
+
+    def insert_batch(self, words) -> None:
+        words = list(words)
+        self._scatter({
+            shard: ("insert_batch", ([words[i] for i in ids],))
+            for shard, ids in self._group(words).items()
+        })
+
+    def delete(self, word: str) -> None:
+        self._scatter({self.shard_of(word): ("delete", ([word],))})
+
+    # -------------------------------
+    # Queries
+    # -------------------------------
+    def search(self, pattern: str) -> bool:
+        return self.search_many([pattern])[0]
+
+    def search_many(self, patterns):
+        patterns = list(patterns)
+        groups = self._group(patterns)
+        replies = self._scatter({
+            shard: ("search_many", ([patterns[i] for i in ids],))
+            for shard, ids in groups.items()
+        })
+        results = [False] * len(patterns)
+        for shard, ids in groups.items():
+            for i, found in zip(ids, replies[shard]):
+                results[i] = found
+        return results
+
+    def range_search(self, suffix: str, limit=None, offset: int = 0):
+        """Words ending with suffix, in inverted-word order."""
+        # Every shard sends only its first offset + limit matches
+        stop = None if limit is None else offset + limit
+        replies = self._scatter({
+            shard: ("range_search", (suffix, stop))
+            for shard in self._shards_for_suffix(suffix)
+        })
+        merged = heapq.merge(*replies.values(), key=_inverted_key)
+        return list(islice(merged, offset, stop))
+
+    def range_search_many(self, suffixes):
+        suffixes = list(suffixes)
+        groups = {}
+        for i, suffix in enumerate(suffixes):
+            for shard in self._shards_for_suffix(suffix):
+                groups.setdefault(shard, []).append(i)
+        replies = self._scatter({
+            shard: ("range_search_many", ([suffixes[i] for i in ids],))
+            for shard, ids in groups.items()
+        })
+
+        parts = [[] for _ in suffixes]
+        for shard, ids in groups.items():
+            for i, matches in zip(ids, replies[shard]):
+                parts[i].append(matches)
+        return [list(heapq.merge(*runs, key=_inverted_key)) for runs in parts]
+
+    def count_suffix(self, suffix: str) -> int:
+        replies = self._scatter({
+            shard: ("count_suffix", (suffix,))
+            for shard in self._shards_for_suffix(suffix)
+        })
+        return sum(replies.values())
+
+    def memory_usage(self) -> int:
+        replies = self._scatter({shard: ("memory_usage", ()) for shard in range(self.shards)})
+        return sum(replies.values())
+
+    # -------------------------------
+    # Lifecycle
+    # -------------------------------
+    def close(self) -> None:
+        for conn, lock, process in zip(self._conns, self._locks, self._processes):
+            with lock:
+                if not conn.closed:
+                    conn.send(None)
+                    conn.close()
+            process.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,177 @@
+import threading
+
+from suffix_array import InvertedSuffixArray
+
+OP_INSERT = 1
+OP_DELETE = 2
+
+
+class SnapshotSuffixArray:
+    """
+    InvertedSuffixArray that stays readable while it is rebuilt.
+
+    Readers query the current snapshot: an InvertedSuffixArray that is
+    never modified once published, so its text, suffix array and word
+    store always belong together. Updates are queued under one writer
+    lock and applied by a background thread, which builds a new snapshot
+    from the old one's words and publishes it by reassigning a single
+    attribute. Readers never take a lock and never wait for a rebuild;
+    they see a write once the snapshot containing it is published (see
+    flush). Updates queued during a rebuild go into the next one together.
+    """
+
+    def __init__(self, algorithm: str = "doubling", use_rmq: bool = False, workers: int = 1):
+        self._index_args = {"algorithm": algorithm, "use_rmq": use_rmq, "workers": workers}
+        self._snapshot = InvertedSuffixArray(**self._index_args)
+        self.generation = 0
+
+        # Guards the queue and the sequence numbers; writers and the
+        # rebuild thread hold it only to hand over a batch
+        self._lock = threading.Lock()
+        self._queued = threading.Condition(self._lock)
+        self._published = threading.Condition(self._lock)
+        self._pending = []
+        self._submitted = 0
+        self._applied = 0
+        self._error = None
+        self._closed = False
+
+        self._worker = threading.Thread(target=self._rebuild_loop, daemon=True)
+        self._worker.start()
+
+    @property
+    def snapshot(self) -> InvertedSuffixArray:
+        """The current published snapshot (treat as read-only)."""
+        return self._snapshot
+
+    # -------------------------------
+    # Queries (lock-free, on one snapshot)
+    # -------------------------------
+    def search(self, pattern: str) -> bool:
+        return self._snapshot.search(pattern)
+
+    def range_search(self, pattern: str, limit=None, offset: int = 0):
+        return self._snapshot.range_search(pattern, limit=limit, offset=offset)
+
+    def iter_range_search(self, pattern: str):
+        return self._snapshot.iter_range_search(pattern)
+
+    def count_suffix(self, pattern: str) -> int:
+        return self._snapshot.count_suffix(pattern)
+
+    def contains(self, substring: str):
+        return self._snapshot.contains(substring)
+
+    def occurrences(self, substring: str):
+        return self._snapshot.occurrences(substring)
+
+    def search_many(self, patterns):
+        return self._snapshot.search_many(patterns)
+
+    def range_search_many(self, patterns):
+        return self._snapshot.range_search_many(patterns)
+
+    def memory_usage(self) -> int:
+        return self._snapshot.memory_usage()
+
+    def memory_report(self) -> dict:
+        return self._snapshot.memory_report()
+
+    # -------------------------------
+    # Updates (serialized, applied by the rebuild thread)
+    # -------------------------------
+    def insert(self, word: str) -> None:
+        self._enqueue([(OP_INSERT, word)])
+
+    def insert_batch(self, words) -> None:
+        self._enqueue([(OP_INSERT, word) for word in words])
+
+    def delete(self, word: str) -> None:
+        self._enqueue([(OP_DELETE, word)])
+
+    def _enqueue(self, ops) -> None:
+        with self._lock:
+            self._check_usable()
+            self._pending.extend(ops)
+            self._submitted += len(ops)
+            self._queued.notify()
+
+    def flush(self, timeout=None) -> bool:
+        """
+        Wait until every update queued so far is visible to readers.
+        Returns False if timeout (seconds) expires first.
+        """
+        with self._lock:
+            target = self._submitted
+            done = self._published.wait_for(
+                lambda: self._applied >= target or self._error is not None,
+                timeout,
+            )
+            self._check_usable()
+            return done
+
+    def _check_usable(self) -> None:
+        if self._error is not None:
+            raise RuntimeError("Snapshot rebuild failed") from self._error
+        if self._closed:
+            raise ValueError("SnapshotSuffixArray is closed")
+
+    # -------------------------------
+    # Background rebuild + atomic publish
+    # -------------------------------
+    def _rebuild_loop(self) -> None:
+        while True:
+            with self._lock:
+                self._queued.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    return
+                batch, self._pending = self._pending, []
+
+            try:
+                snapshot = self._build_snapshot(self._snapshot, batch)
+            except Exception as exc:
+                with self._lock:
+                    self._error = exc
+                    self._published.notify_all()
+                return
+
+            with self._lock:
+                # The only point where readers switch over
+                self._snapshot = snapshot
+                self.generation += 1
+                self._applied += len(batch)
+                self._published.notify_all()
+
+    def _build_snapshot(self, base: InvertedSuffixArray, batch) -> InvertedSuffixArray:
+        """A new snapshot holding base's live words with batch applied in order."""
+        words = dict.fromkeys(
+            word for word, dead in zip(base.strings, base._dead) if not dead
+        )
+        for op, word in batch:
+            word = base.invert_string(word)
+            if op == OP_INSERT:
+                words[word] = None
+            else:
+                words.pop(word, None)
+
+        snapshot = InvertedSuffixArray(**self._index_args)
+        for word in words:
+            snapshot._append_word(word)
+        snapshot._rebuild_suffix_array()
+        return snapshot
+
+    # -------------------------------
+    # Lifecycle
+    # -------------------------------
+    def close(self) -> None:
+        """Publish the queued updates, then stop the rebuild thread."""
+        with self._lock:
+            self._closed = True
+            self._queued.notify()
+        self._worker.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
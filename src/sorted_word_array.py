@@ -0,0 +1,322 @@
+import sys
+from bisect import bisect_left, bisect_right, insort
+from itertools import islice
+
+import numpy as np
+from memory_report import MemoryCounter
+
+# Inverted words are kept as UTF-8, whose byte order is code point order.
+# 0xFF never occurs in UTF-8, so key + _HIGH sorts after every word that
+# starts with key.
+_HIGH = b"\xff"
+
+
+def _put_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _get_varint(data: bytes, pos: int):
+    byte = data[pos]
+    pos += 1
+    if byte < 0x80:
+        return byte, pos
+    value = byte & 0x7F
+    shift = 7
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+class SortedWordArray:
+    """
+    Lightweight whole-word / word-suffix index: only the inverted words,
+    sorted, in one front-coded byte buffer. Unlike the suffix array there
+    is one entry per word, not per character.
+
+    - Words are stored inverted and UTF-8 encoded, in blocks of
+      block_size. The first word of a block is stored whole, the others
+      as (length shared with the previous word, rest), both varints
+    - heads holds the first word of every block for bisect
+    - search: bisect over heads, then one block decoded and bisected
+    - range_search: two such lower bounds (key and key + 0xFF), then the
+      blocks between them decoded
+
+    Same API as PrefixTrie / InvertedSuffixArray. New words wait in a
+    sorted pending list until merge_threshold of them are merged into the
+    buffer; deletes are tombstones, compacted like the suffix array's.
+    """
+
+    # Words resolved per step by iter_range_search
+    ITER_CHUNK = 1024
+
+    def __init__(self, block_size: int = 16, merge_threshold: int = 256,
+                 compaction_threshold: float = 0.2):
+        self.block_size = block_size
+        self.merge_threshold = merge_threshold
+        self.compaction_threshold = compaction_threshold
+        self._data = b""
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._heads = []
+        self.size = 0
+
+        # Tombstone byte per word id, plus the sorted ids for range counts
+        self._dead = bytearray()
+        self._dead_ids = []
+        self.dead_count = 0
+
+        # Inverted UTF-8 words not merged into the buffer yet, sorted
+        self._pending = []
+
+    # -------------------------------
+    # String inversion
+    # -------------------------------
+    def invert_string(self, s: str) -> str:
+        return s[::-1]
+
+    def _key(self, word: str) -> bytes:
+        return self.invert_string(word).encode("utf-8")
+
+    def _word(self, key: bytes) -> str:
+        return self.invert_string(key.decode("utf-8"))
+
+    # -------------------------------
+    # Build: sorted keys -> front-coded blocks
+    # -------------------------------
+    def _build(self, keys) -> None:
+        """Encode sorted, distinct keys as the new buffer (clears tombstones)."""
+        block_size = self.block_size
+        data = bytearray()
+        offsets = []
+        heads = []
+        for start in range(0, len(keys), block_size):
+            offsets.append(len(data))
+            heads.append(keys[start])
+            prev = b""
+            for key in keys[start:start + block_size]:
+                shared = 0
+                limit = min(len(prev), len(key))
+                while shared < limit and prev[shared] == key[shared]:
+                    shared += 1
+                _put_varint(data, shared)
+                _put_varint(data, len(key) - shared)
+                data += key[shared:]
+                prev = key
+        offsets.append(len(data))
+
+        self._data = bytes(data)
+        self._offsets = np.array(offsets, dtype=np.int64)
+        self._heads = heads
+        self.size = len(keys)
+        self._dead = bytearray(len(keys))
+        self._dead_ids = []
+        self.dead_count = 0
+
+    def _block(self, b: int):
+        """Decode block b into its keys."""
+        data = self._data
+        pos = int(self._offsets[b])
+        end = int(self._offsets[b + 1])
+        keys = []
+        prev = b""
+        while pos < end:
+            shared, pos = _get_varint(data, pos)
+            length, pos = _get_varint(data, pos)
+            prev = prev[:shared] + data[pos:pos + length]
+            pos += length
+            keys.append(prev)
+        return keys
+
+    def _decode(self, left: int, right: int):
+        """Keys of word ids [left, right), dead ones included."""
+        if left >= right:
+            return []
+        block_size = self.block_size
+        first = left // block_size
+        keys = []
+        for b in range(first, (right - 1) // block_size + 1):
+            keys.extend(self._block(b))
+        start = left - first * block_size
+        return keys[start:start + right - left]
+
+    def _live_keys(self, left: int, right: int, offset: int = 0, stop=None):
+        """Live keys of ids [left, right), cut to [offset:stop]."""
+        if not self.dead_count:
+            hi = right if stop is None else min(left + stop, right)
+            return self._decode(min(left + offset, right), hi)
+        dead = self._dead
+        live = [key for i, key in enumerate(self._decode(left, right), left) if not dead[i]]
+        return live[offset:stop]
+
+    # -------------------------------
+    # Insert: pending list, merged in batches
+    # -------------------------------
+    def insert(self, word: str) -> None:
+        key = self._key(word)
+        if self._find(key) is not None:
+            return
+        pending = self._pending
+        i = bisect_left(pending, key)
+        if i < len(pending) and pending[i] == key:
+            return
+        pending.insert(i, key)
+        if len(pending) >= self.merge_threshold:
+            self.merge()
+
+    def insert_batch(self, words):
+        """Insert multiple words with a single sort and encode."""
+        keys = set(self._live_keys(0, self.size))
+        keys.update(self._pending)
+        keys.update(self._key(word) for word in words)
+        self._pending = []
+        self._build(sorted(keys))
+
+    def merge(self) -> None:
+        """Fold the pending words (and drop tombstones) into the buffer."""
+        keys = self._live_keys(0, self.size) + self._pending
+        keys.sort()
+        self._pending = []
+        self._build(keys)
+
+    # -------------------------------
+    # Search: bisect over block heads
+    # -------------------------------
+    def _lower_bound(self, key: bytes) -> int:
+        """Id of the first word >= key."""
+        b = bisect_right(self._heads, key) - 1
+        if b < 0:
+            return 0
+        return b * self.block_size + bisect_left(self._block(b), key)
+
+    def _find(self, key: bytes):
+        """Id of the live word equal to key, or None."""
+        b = bisect_right(self._heads, key) - 1
+        if b < 0:
+            return None
+        block = self._block(b)
+        i = bisect_left(block, key)
+        if i < len(block) and block[i] == key:
+            word_id = b * self.block_size + i
+            if not self._dead[word_id]:
+                return word_id
+        return None
+
+    def search(self, pattern: str) -> bool:
+        key = self._key(pattern)
+        if self._find(key) is not None:
+            return True
+        pending = self._pending
+        i = bisect_left(pending, key)
+        return i < len(pending) and pending[i] == key
+
+    def search_many(self, patterns):
+        search = self.search
+        return [search(p) for p in patterns]
+
+    # -------------------------------
+    # Range search (word-suffix query)
+    # -------------------------------
+    def _bounds(self, key: bytes):
+        """Id range and pending range of the words starting with key."""
+        high = key + _HIGH
+        pending = self._pending
+        return (self._lower_bound(key), self._lower_bound(high),
+                bisect_left(pending, key), bisect_left(pending, high))
+
+    def _dead_between(self, left: int, right: int) -> int:
+        dead = self._dead_ids
+        return bisect_left(dead, right) - bisect_left(dead, left)
+
+    def range_search(self, pattern: str, limit=None, offset: int = 0):
+        """
+        Words ending with pattern: buffer matches in inverted-word order,
+        then pending matches. limit/offset select one page of them.
+        """
+        left, right, p_left, p_right = self._bounds(self._key(pattern))
+        stop = None if limit is None else offset + limit
+        keys = self._live_keys(left, right, offset, stop)
+
+        # Continue the page into the pending words
+        found = right - left - self._dead_between(left, right)
+        p_offset = max(offset - found, 0)
+        p_stop = None if stop is None else max(stop - found, 0)
+        keys += islice(self._pending[p_left:p_right], p_offset, p_stop)
+        return [key.decode("utf-8")[::-1] for key in keys]
+
+    def iter_range_search(self, pattern: str):
+        """
+        Lazily yield range_search(pattern) results, decoding ITER_CHUNK
+        words at a time.
+        """
+        left, right, p_left, p_right = self._bounds(self._key(pattern))
+        word = self._word
+        for start in range(left, right, self.ITER_CHUNK):
+            for key in self._live_keys(start, min(start + self.ITER_CHUNK, right)):
+                yield word(key)
+        for key in self._pending[p_left:p_right]:
+            yield word(key)
+
+    def range_search_many(self, patterns):
+        range_search = self.range_search
+        return [range_search(p) for p in patterns]
+
+    def count_suffix(self, pattern: str) -> int:
+        """Number of words ending with pattern, from the bounds alone."""
+        left, right, p_left, p_right = self._bounds(self._key(pattern))
+        return right - left - self._dead_between(left, right) + p_right - p_left
+
+    # -------------------------------
+    # Delete: tombstone, compact when the dead ratio is too high
+    # -------------------------------
+    def delete(self, word: str) -> None:
+        key = self._key(word)
+        pending = self._pending
+        i = bisect_left(pending, key)
+        if i < len(pending) and pending[i] == key:
+            del pending[i]
+            return
+
+        word_id = self._find(key)
+        if word_id is None:
+            return
+        self._dead[word_id] = 1
+        insort(self._dead_ids, word_id)
+        self.dead_count += 1
+        if self.dead_count > self.compaction_threshold * self.size:
+            self.compact()
+
+    def compact(self) -> None:
+        """Rebuild the buffer over the live words only."""
+        if self.dead_count:
+            self.merge()
+
+    # -------------------------------
+    # Memory usage (bytes)
+    # -------------------------------
+    def memory_usage(self) -> int:
+        heads_bytes = sys.getsizeof(self._heads) + sum(sys.getsizeof(h) for h in self._heads)
+        pending_bytes = sum(len(key) for key in self._pending)
+        return (len(self._data) + self._offsets.nbytes + heads_bytes
+                + len(self._dead) + pending_bytes)
+
+    def memory_report(self) -> dict:
+        """
+        Bytes of the front-coded words buffer, the block index (offsets
+        and head keys), the tombstones and the pending unmerged words.
+        """
+        counter = MemoryCounter()
+        counter.add_objects("words", [self._data])
+        counter.add_arrays("block_index", self._offsets)
+        counter.add_objects("block_index", [self._heads])
+        counter.add_objects("block_index", self._heads)
+        counter.add_objects("tombstones", [self._dead, self._dead_ids])
+        counter.add_objects("tombstones", self._dead_ids)
+        counter.add_objects("pending", [self._pending])
+        counter.add_objects("pending", self._pending)
+        return counter.report()
@@ -1,12 +1,86 @@
+import heapq
+import json
+import os
+from bisect import bisect_left, bisect_right, insort
+from itertools import islice
+
 import numpy as np
+from memory_report import MemoryCounter
+from parallel_build import parallel_suffix_array
+from sa_construction import (
+    SENTINEL,
+    LcpRmq,
+    build_lcp_array,
+    build_suffix_array,
+    decode_table,
+    decode_words,
+    encode_words,
+    sentinel_ranks,
+    suffix_array_builder,
+)
+
+# On-disk index format (see InvertedSuffixArray.save)
+INDEX_FORMAT = "inverted-suffix-array"
+INDEX_VERSION = 2
+INDEX_ARRAYS = ("codes", "suffix_array", "lcp", "word_starts", "start_rank",
+                "word_rank", "word_order", "dead")
 
 
 class InvertedSuffixArray:
-    def __init__(self):
+    # Words resolved per step by iter_range_search
+    ITER_CHUNK = 1024
+
+    def __init__(
+        self,
+        algorithm: str = "doubling",
+        use_rmq: bool = False,
+        mutable: bool = False,
+        delta_threshold: int = 256,
+        merge_ratio: float = 0.25,
+        compaction_threshold: float = 0.2,
+        workers: int = 1,
+    ):
+        """
+        algorithm picks the serial suffix array builder (see
+        SA_ALGORITHMS). With workers > 1 the suffix array is built by the
+        parallel bucket sort (parallel_build.parallel_suffix_array)
+        instead, and algorithm is not used.
+        """
+        # Reject unknown algorithms now rather than on the first build
+        suffix_array_builder(algorithm)
+        self.algorithm = algorithm
+        self.use_rmq = use_rmq
+        self.workers = workers
         self.strings = []
-        self.text = ""
+        self.codes = np.array([], dtype=np.uint8)
+        self._code_view = memoryview(self.codes)
+        self.alphabet = ""
+        self._char_codes = {}
         self.suffix_array = np.array([], dtype=np.int32)
-        self.strings_set = set(self.strings)
+        self.lcp = np.array([], dtype=np.int32)
+        self._rmq = None
+        self.word_starts = np.zeros(1, dtype=np.int64)
+        self.start_rank = np.zeros(1, dtype=np.int32)
+        self.word_rank = np.array([], dtype=np.int32)
+        self.word_order = np.array([], dtype=np.int32)
+
+        # Word store: inverted word -> id (position in self.strings) for
+        # live words, plus a tombstone byte per id for deleted ones. After
+        # load() both stay None until the first update; queries decode
+        # their result words from the code buffer meanwhile
+        self.word_ids = {}
+        self._decode_table = None
+        self._dead = bytearray()
+        self._dead_ranks = []
+        self.dead_count = 0
+        self.compaction_threshold = compaction_threshold
+
+        # Mutable mode: LSM-style sorted delta segments over the main SA
+        self.mutable = mutable
+        self.delta_threshold = delta_threshold
+        self.merge_ratio = merge_ratio
+        self.memtable = []
+        self.delta_segments = []
 
     # -------------------------------
     # String inversion
@@ -15,119 +89,643 @@ class InvertedSuffixArray:
         return s[::-1]
 
     # -------------------------------
-    # Insert: invert string and rebuild
+    # Insert: invert string and rebuild (or buffer in mutable mode)
     # -------------------------------
     def insert(self, word: str) -> None:
+        self._load_word_store()
         word = self.invert_string(word)
+        if word in self.word_ids:
+            return
+        if self.mutable:
+            self._insert_delta(word)
+            return
+        self._append_word(word)
+        self._rebuild_suffix_array()
+
+    def _append_word(self, word: str) -> None:
+        self.word_ids[word] = len(self.strings)
         self.strings.append(word)
+        self._dead.append(0)
+
+    # -------------------------------
+    # Delta segments (mutable mode)
+    # -------------------------------
+    def _insert_delta(self, word: str) -> None:
+        """
+        Buffer an inverted word in the sorted memtable. A full memtable
+        becomes an immutable delta segment; equally sized segments are
+        merged like a binary counter, so each word is merged O(log n)
+        times. Once the deltas outgrow merge_ratio of the main segment
+        they are folded into the main suffix array.
+        """
+        if self._in_deltas(word):
+            return
+        insort(self.memtable, word)
+        if len(self.memtable) < self.delta_threshold:
+            return
+
+        self.delta_segments.append(self.memtable)
+        self.memtable = []
+        segments = self.delta_segments
+        while len(segments) >= 2 and len(segments[-2]) <= len(segments[-1]):
+            newer = segments.pop()
+            older = segments.pop()
+            segments.append(list(heapq.merge(older, newer)))
+
+        delta_size = sum(len(segment) for segment in segments)
+        if delta_size > self.merge_ratio * len(self.word_ids):
+            self.merge_segments()
+
+    def merge_segments(self) -> None:
+        """Fold the memtable and all delta segments into the main suffix array."""
+        if not self.memtable and not self.delta_segments:
+            return
+        self._drain_deltas()
         self._rebuild_suffix_array()
 
+    def _drain_deltas(self) -> None:
+        word_ids = self.word_ids
+        for segment in self.delta_segments + [self.memtable]:
+            for word in segment:
+                # insert_batch may already have stored a buffered word
+                if word not in word_ids:
+                    self._append_word(word)
+        self.memtable = []
+        self.delta_segments = []
+
+    def _delta_runs(self):
+        if self.memtable:
+            yield self.memtable
+        yield from self.delta_segments
+
+    def _in_deltas(self, word: str) -> bool:
+        for run in self._delta_runs():
+            i = bisect_left(run, word)
+            if i < len(run) and run[i] == word:
+                return True
+        return False
+
+    def _delta_range_search(self, pattern: str):
+        """Delta words whose inverted form starts with the inverted pattern."""
+        m = len(pattern)
+        for run in self._delta_runs():
+            left = bisect_left(run, pattern)
+            right = bisect_right(run, pattern, lo=left, key=lambda w: w[:m])
+            for word in run[left:right]:
+                yield word
+
+    def _delete_delta(self, word: str) -> bool:
+        for run in self._delta_runs():
+            i = bisect_left(run, word)
+            if i < len(run) and run[i] == word:
+                del run[i]
+                return True
+        return False
+
     # -------------------------------
-    # Build suffix array (O(n log n))
+    # Build suffix array (SA-IS O(n) / prefix doubling O(n log n))
     # -------------------------------
     def _rebuild_suffix_array(self) -> None:
         """
-        Optimized suffix array construction:
-        - Stores only indices, not full suffix strings
-        - Uses NumPy array for memory efficiency
+        Exact suffix array construction:
+        - Runs on the integer-coded text, no per-suffix slices
+        - Stores only indices in a NumPy array
+        - Algorithm chosen by self.algorithm ("doubling" or "sais"), or
+          bucket-parallel sorting across processes when self.workers > 1
+        - LCP array (and optional RMQ) for LCP-accelerated searches
+        - Word start offsets to map SA positions back to word ids
+        - Word-start ranks so suffix queries can be counted in O(1)
         """
 
-        # Concatenate inverted strings with unique delimiters
-        self.text = "".join(s + chr(0xE000 + i) for i, s in enumerate(self.strings))
-        N = len(self.text)
+        # Compact uint8/uint16 code buffer, one shared sentinel per word end.
+        # word_starts[i] is the offset of word i; the extra last entry is
+        # len(codes), so word i spans word_starts[i]:word_starts[i + 1] - 1
+        self.codes, self.word_starts, self.alphabet = encode_words(self.strings)
+        self._code_view = memoryview(self.codes)
+        self._char_codes = {ch: i + 1 for i, ch in enumerate(self.alphabet)}
+
+        # Sort with unique per-word sentinels so suffixes never compare
+        # across word boundaries
+        ranks = sentinel_ranks(self.codes, self.word_starts)
+        if self.workers > 1:
+            self.suffix_array = parallel_suffix_array(
+                self.codes, self.word_starts, self.workers)
+        else:
+            self.suffix_array = build_suffix_array(ranks, self.algorithm)
+        self.lcp = build_lcp_array(ranks, self.suffix_array)
+        self._rmq = LcpRmq(self.lcp) if self.use_rmq else None
+        self._index_word_ranks()
 
-        # Store all starting indices
-        indices = np.arange(N, dtype=np.int32)
+    def _index_word_ranks(self) -> None:
+        """
+        word_rank[i] is the SA rank of word i's first suffix and
+        start_rank[r] the number of word-first suffixes among ranks < r, so
+        a rank range holds start_rank[right] - start_rank[left] words.
+        word_order lists the word ids by word_rank: the words of a rank
+        range are the slice word_order[start_rank[left]:start_rank[right]].
+        """
+        n = len(self.suffix_array)
+        rank_of = np.empty(n, dtype=np.int32)
+        rank_of[self.suffix_array] = np.arange(n, dtype=np.int32)
+        self.word_rank = rank_of[self.word_starts[:-1]]
 
-        # Sort indices based on underlying string
-        # Only slice first K characters to speed up comparison (approximation)
-        K = 50  # adjust depending on average word length
-        indices = sorted(indices, key=lambda i: self.text[i:i+K])
+        is_start = np.zeros(n, dtype=np.int32)
+        is_start[self.word_rank] = 1
+        self.start_rank = np.concatenate(([0], np.cumsum(is_start, dtype=np.int32)))
 
-        # Convert to NumPy array for sequential memory
-        self.suffix_array = np.array(indices, dtype=np.int32)
+        self.word_order = np.empty(len(self.word_rank), dtype=np.int32)
+        self.word_order[self.start_rank[self.word_rank]] = np.arange(
+            len(self.word_rank), dtype=np.int32)
 
+        dead_ids = np.flatnonzero(np.frombuffer(self._dead, dtype=np.uint8))
+        self._dead_ranks = sorted(self.word_rank[dead_ids].tolist())
 
     # -------------------------------
     # Search: binary search (O(m log n))
     # -------------------------------
     def search(self, pattern: str) -> bool:
         pattern = self.invert_string(pattern)
-        left = self._lower_bound(pattern)
+        if self._in_deltas(pattern):
+            return True
 
-        if left >= len(self.suffix_array):
+        codes = self._encode_pattern(pattern)
+        if codes is None:
             return False
 
-        start = self.suffix_array[left]
-        return self.text[start:start + len(pattern)] == pattern
+        # Whole-word matches are the suffixes equal to pattern + sentinel
+        # that start a live word. They sort before pattern + the smallest
+        # character code; the sentinel itself is never put in a pattern
+        # because the SA orders sentinels by word id.
+        left = self._lower_bound(codes)
+        right = self._lower_bound(codes + [SENTINEL + 1])
+        return len(self._live_word_ids(left, right)) > 0
 
     # -------------------------------
     # Range search: binary search bounds
     # -------------------------------
-    def range_search(self, pattern: str):
+    def range_search(self, pattern: str, limit=None, offset: int = 0):
+        """
+        Words ending with pattern: main segment matches in SA order, then
+        delta segment matches. limit/offset select one page of them.
+        """
         pattern = self.invert_string(pattern)
+        stop = None if limit is None else offset + limit
+
+        # Live words whose inverted form starts with the inverted pattern.
+        # Pages are cut on the id array, before any string is built.
+        ids = self._range_ids(pattern)
+        page = ids[offset:stop]
+        results = self._words(page)
+
+        # Merge in matches still buffered in the delta segments
+        delta_offset = max(offset - len(ids), 0)
+        delta_stop = None if stop is None else max(stop - len(ids), 0)
+        for word in islice(self._delta_range_search(pattern), delta_offset, delta_stop):
+            results.append(self.invert_string(word))
+
+        return results
+
+    def iter_range_search(self, pattern: str):
+        """
+        Lazily yield range_search(pattern) results, resolving ITER_CHUNK
+        words at a time.
+        """
+        pattern = self.invert_string(pattern)
+        ids = self._range_ids(pattern)
+        for chunk in range(0, len(ids), self.ITER_CHUNK):
+            yield from self._words(ids[chunk:chunk + self.ITER_CHUNK])
+
+        for word in self._delta_range_search(pattern):
+            yield self.invert_string(word)
+
+    def count_suffix(self, pattern: str) -> int:
+        """
+        Number of words ending with pattern, without building any result:
+        two bound searches, a start_rank difference, and a bisect over the
+        tombstoned ranks.
+        """
+        pattern = self.invert_string(pattern)
+        count = sum(1 for _ in self._delta_range_search(pattern))
+
+        codes = self._encode_pattern(pattern)
+        if codes is not None:
+            left = self._lower_bound(codes)
+            right = self._upper_bound(codes)
+            count += int(self.start_rank[right] - self.start_rank[left])
+            dead = self._dead_ranks
+            count -= bisect_left(dead, right) - bisect_left(dead, left)
+        return count
+
+    def _range_ids(self, pattern: str) -> np.ndarray:
+        """Live main-segment ids matching an inverted pattern, in SA order."""
+        codes = self._encode_pattern(pattern)
+        if codes is None:
+            return np.array([], dtype=np.int64)
+        left = self._lower_bound(codes)
+        right = self._upper_bound(codes)
+        return self._live_word_ids(left, right)
+
+    # -------------------------------
+    # Infix search: all suffixes, not just word starts
+    # -------------------------------
+    def contains(self, substring: str):
+        """
+        Words containing substring: main segment words in id order, then
+        delta segment matches. The reversed substring bounds a rank range
+        of suffixes starting anywhere inside a word.
+        """
+        pattern = self.invert_string(substring)
+        ids, _ = self._infix_positions(pattern)
+        results = self._words(np.unique(ids))
+
+        for run in self._delta_runs():
+            results.extend(self.invert_string(w) for w in run if pattern in w)
+        return results
+
+    def occurrences(self, substring: str):
+        """
+        (word id, offset) of every occurrence of substring, with offsets
+        into the original (non-inverted) word, sorted. Ids index
+        self.strings, so words still buffered in delta segments are only
+        reported once merged into the main suffix array.
+        """
+        pattern = self.invert_string(substring)
+        ids, local = self._infix_positions(pattern)
+
+        # An inverted match at local offset k of a word of length n is an
+        # original match at n - k - m
+        lengths = self.word_starts[ids + 1] - self.word_starts[ids] - 1
+        offsets = lengths - local - len(pattern)
+        order = np.lexsort((offsets, ids))
+        return list(zip(ids[order].tolist(), offsets[order].tolist()))
+
+    def _infix_positions(self, pattern: str):
+        """Word ids and in-word offsets of the live suffixes starting with an inverted pattern."""
+        codes = self._encode_pattern(pattern)
+        if codes is None:
+            empty = np.array([], dtype=np.int64)
+            return empty, empty
+
+        left = self._lower_bound(codes)
+        right = self._upper_bound(codes)
+        positions = self.suffix_array[left:right].astype(np.int64)
+        ids = self._word_id(positions)
+        if self.dead_count:
+            live = np.frombuffer(self._dead, dtype=np.uint8)[ids] == 0
+            positions, ids = positions[live], ids[live]
+        return ids, positions - self.word_starts[ids]
+
+    # -------------------------------
+    # Batched queries (lock-step binary search)
+    # -------------------------------
+    def search_many(self, patterns):
+        """
+        search() for a batch of patterns, results in input order.
+
+        All patterns are binary searched in lock-step: each of the
+        ~log2(N) rounds gathers and compares one window of codes per
+        pattern in a single vectorized step, instead of paying the Python
+        loop and call overhead once per pattern.
+        """
+        inverted = [self.invert_string(p) for p in patterns]
+        matrix, lengths, known = self._pattern_matrix(inverted)
+
+        # Whole-word range: [lower(pattern), lower(pattern + smallest code))
+        left = self._bounds_many(matrix, lengths, strict=False)
+        extended = np.concatenate(
+            (matrix, np.zeros((len(matrix), 1), dtype=matrix.dtype)), axis=1)
+        extended[np.arange(len(matrix)), lengths] = SENTINEL + 1
+        right = self._bounds_many(extended, lengths + 1, strict=False)
+        right[~known] = left[~known]
+
+        found = self._any_live_word(left, right)
+        if self.memtable or self.delta_segments:
+            for i, word in enumerate(inverted):
+                if not found[i] and self._in_deltas(word):
+                    found[i] = True
+        return found.tolist()
+
+    def range_search_many(self, patterns):
+        """range_search() for a batch of patterns, results in input order."""
+        inverted = [self.invert_string(p) for p in patterns]
+
+        # Repeated patterns in the batch are searched only once
+        distinct = list(dict.fromkeys(inverted))
+        matrix, lengths, known = self._pattern_matrix(distinct)
+        left = self._bounds_many(matrix, lengths, strict=False)
+        right = self._bounds_many(matrix, lengths, strict=True)
+        right[~known] = left[~known]
+
+        matches = {}
+        for i, word in enumerate(distinct):
+            found = []
+            if left[i] < right[i]:
+                ids = self._live_word_ids(left[i], right[i])
+                found = self._words(ids)
+            for delta_word in self._delta_range_search(word):
+                found.append(self.invert_string(delta_word))
+            matches[word] = found
+
+        # Repeats of a pattern get their own copy of its result list
+        results = []
+        returned = set()
+        for word in inverted:
+            found = matches[word]
+            results.append(list(found) if word in returned else found)
+            returned.add(word)
+        return results
 
-        left = self._lower_bound(pattern)
-        right = self._upper_bound(pattern)
+    def _any_live_word(self, left, right) -> np.ndarray:
+        """
+        Vectorized bool per row: does SA rank range [left[i], right[i])
+        hold the first suffix of a live word?
+        """
+        count = self.start_rank[right] - self.start_rank[left]
+        if self._dead_ranks:
+            dead = np.array(self._dead_ranks)
+            count -= np.searchsorted(dead, right) - np.searchsorted(dead, left)
+        return count > 0
+
+    def _pattern_matrix(self, inverted):
+        """
+        Encode inverted patterns into one zero-padded int64 matrix.
+
+        Returns:
+            (matrix, lengths, known) where known[i] is False for patterns
+            using a character outside the alphabet (their row is empty)
+        """
+        encoded = [self._encode_pattern(p) for p in inverted]
+        known = np.array([codes is not None for codes in encoded], dtype=bool)
+        lengths = np.array([len(codes) if codes is not None else 0
+                            for codes in encoded], dtype=np.int64)
+        width = int(lengths.max()) if len(lengths) else 0
+        matrix = np.zeros((len(encoded), width), dtype=np.int64)
+        for i, codes in enumerate(encoded):
+            if codes:
+                matrix[i, :len(codes)] = codes
+        return matrix, lengths, known
+
+    def _bounds_many(self, matrix, lengths, strict: bool) -> np.ndarray:
+        """
+        Vectorized _bound() for every row of a pattern matrix at once.
+        Row i is compared on its first lengths[i] codes only.
+        """
+        sa = self.suffix_array
+        codes = self.codes
+        n = len(codes)
+        count, width = matrix.shape
+        if width == 0:
+            # Only empty rows: every suffix starts with the empty pattern
+            return np.full(count, len(sa) if strict else 0, dtype=np.int64)
+        lo = np.full(count, -1, dtype=np.int64)
+        hi = np.full(count, len(sa), dtype=np.int64)
+        offsets = np.arange(width)
 
-        results = set()
-        for i in range(left, right):
-            start = self.suffix_array[i]
-            suffix = self.text[start:]
+        active = np.flatnonzero(hi - lo > 1)
+        while active.size:
+            mid = (lo[active] + hi[active]) // 2
+            positions = sa[mid][:, None].astype(np.int64) + offsets
+            text = np.where(positions < n,
+                            codes[np.minimum(positions, n - 1)], -1)
+            pattern = matrix[active]
 
-            # Extract original word (before delimiter)
-            for ch in suffix:
-                if ord(ch) >= 0xE000:
-                    break
-            word = suffix[:suffix.index(ch)][::-1]
-            results.add(word)
+            differs = (text != pattern) & (offsets < lengths[active, None])
+            mismatch = differs.any(axis=1)
+            first = differs.argmax(axis=1)
+            rows = np.arange(len(active))
+            greater = mismatch & (pattern[rows, first] > text[rows, first])
 
-        return list(results)
+            go_right = greater | (~mismatch if strict else False)
+            lo[active[go_right]] = mid[go_right]
+            hi[active[~go_right]] = mid[~go_right]
+            active = active[hi[active] - lo[active] > 1]
+
+        return hi
+
+    # -------------------------------
+    # Code buffer helpers
+    # -------------------------------
+    def _encode_pattern(self, pattern: str):
+        """
+        Pattern as a list of character codes, or None if it uses a
+        character that no indexed word contains (so it cannot match).
+        """
+        char_codes = self._char_codes
+        try:
+            return [char_codes[ch] for ch in pattern]
+        except KeyError:
+            return None
+
+    def suffix(self, position: int) -> str:
+        """Decode the (inverted) suffix at a text position up to its word end."""
+        end = self.word_starts[self._word_id(position) + 1] - 1
+        alphabet = self.alphabet
+        return "".join(alphabet[c - 1] for c in self.codes[position:end].tolist())
 
     # -------------------------------
-    # Delete: remove string and rebuild
+    # Position -> word id
+    # -------------------------------
+    def _word_id(self, positions) -> np.ndarray:
+        """Word id of each text position (vectorized searchsorted)."""
+        return np.searchsorted(self.word_starts, positions, side="right") - 1
+
+    def _live_word_ids(self, left: int, right: int) -> np.ndarray:
+        """
+        Ids of the live words whose first suffix lies in SA ranks
+        [left, right), in SA (inverted lexicographic) order. Suffixes that
+        start inside a word are skipped, so every id appears once.
+        Without tombstones this is a view, so slicing a page is O(1).
+        """
+        ids = self.word_order[self.start_rank[left]:self.start_rank[right]]
+        if self.dead_count:
+            dead = np.frombuffer(self._dead, dtype=np.uint8)
+            ids = ids[dead[ids] == 0]
+        return ids
+
+    def _words(self, ids):
+        """Original words of main-segment ids, in the order given."""
+        if self.strings is not None:
+            strings = self.strings
+            return [strings[i][::-1] for i in ids.tolist()]
+        if not len(ids):
+            return []
+
+        # Not loaded yet: gather each word's codes and sentinel
+        # (word_starts[i]:word_starts[i + 1]) and decode them in one go
+        starts = self.word_starts[ids]
+        lengths = self.word_starts[ids + 1] - starts
+        shift = starts - (np.cumsum(lengths) - lengths)
+        positions = np.repeat(shift, lengths) + np.arange(int(lengths.sum()))
+        words = decode_words(self.codes[positions], self.alphabet, self._decode_table)
+        return [w[::-1] for w in words]
+
+    def _load_word_store(self) -> None:
+        """Decode strings and build word_ids, once, before the first update after load()."""
+        if self.strings is not None:
+            return
+        self.strings = decode_words(self.codes, self.alphabet, self._decode_table)
+        dead = self._dead
+        self.word_ids = {w: i for i, w in enumerate(self.strings) if not dead[i]}
+        self._decode_table = None
+
+    # -------------------------------
+    # Delete: tombstone, compact when the dead ratio is too high
     # -------------------------------
     def delete(self, word: str) -> None:
+        self._load_word_store()
         word = self.invert_string(word)
-        if word in self.strings:
-            self.strings.remove(word)
-            self._rebuild_suffix_array()
+        if self._delete_delta(word):
+            return
 
+        word_id = self.word_ids.pop(word, None)
+        if word_id is None:
+            return
+        self._dead[word_id] = 1
+        self.dead_count += 1
+        insort(self._dead_ranks, int(self.word_rank[word_id]))
+
+        if self.dead_count > self.compaction_threshold * len(self.strings):
+            self.compact()
+
+    def compact(self) -> None:
+        """
+        Drop tombstoned words and rebuild the suffix array over the live
+        ones. Word ids are reassigned in insertion order.
+        """
+        if not self.dead_count:
+            return
+        self._load_word_store()
+        live = [w for w, dead in zip(self.strings, self._dead) if not dead]
+        self.strings = []
+        self.word_ids = {}
+        self._dead = bytearray()
+        self._dead_ranks = []
+        self.dead_count = 0
+        for word in live:
+            self._append_word(word)
+        self._rebuild_suffix_array()
 
     # -------------------------------
-    # Binary search helpers
+    # Binary search helpers (Manber-Myers, LCP-accelerated)
     # -------------------------------
-    def _lower_bound(self, pattern: str) -> int:
-        lo, hi = 0, len(self.suffix_array)
-        while lo < hi:
-            mid = (lo + hi) // 2
-            start = self.suffix_array[mid]
-            if self.text[start:] < pattern:
-                lo = mid + 1
-            else:
-                hi = mid
-        return lo
+    def _lower_bound(self, pattern) -> int:
+        """First SA rank whose suffix is >= pattern."""
+        return self._bound(pattern, strict=False)
 
-    def _upper_bound(self, pattern: str) -> int:
-        lo, hi = 0, len(self.suffix_array)
-        while lo < hi:
+    def _upper_bound(self, pattern) -> int:
+        """First SA rank whose suffix is > pattern and doesn't start with it."""
+        return self._bound(pattern, strict=True)
+
+    def _bound(self, pattern, strict: bool) -> int:
+        """
+        Binary search over the open interval (lo, hi), tracking the LCP of
+        the pattern with the suffixes at both ends. Every probe resumes the
+        comparison at min(llo, lhi) characters; with the RMQ the probe is
+        often decided from the LCP array alone, without touching the text.
+        """
+        sa = self.suffix_array
+        rmq = self._rmq
+        lo, hi = -1, len(sa)
+        llo = lhi = 0
+
+        while hi - lo > 1:
             mid = (lo + hi) // 2
-            start = self.suffix_array[mid]
-            if self.text[start:].startswith(pattern):
-                lo = mid + 1
+
+            if rmq is not None and llo != lhi:
+                if llo > lhi:
+                    shared = rmq.lcp(lo, mid)
+                    if shared > llo:
+                        lo = mid
+                        continue
+                    if shared < llo:
+                        hi, lhi = mid, shared
+                        continue
+                else:
+                    shared = rmq.lcp(mid, hi)
+                    if shared > lhi:
+                        hi = mid
+                        continue
+                    if shared < lhi:
+                        lo, llo = mid, shared
+                        continue
+
+            k, sign = self._compare(pattern, int(sa[mid]), min(llo, lhi))
+            if sign > 0 or (strict and sign == 0):
+                lo, llo = mid, k
             else:
-                hi = mid
-        return lo
+                hi, lhi = mid, k
+
+        return hi
+
+    def _compare(self, pattern, start: int, k: int):
+        """
+        Compare pattern codes with the suffix at start, skipping the first
+        k codes (already known to match). Only up to len(pattern) codes
+        are read.
+
+        Returns:
+            (lcp, sign) with sign > 0 if pattern > suffix, < 0 if
+            pattern < suffix and 0 if the suffix starts with pattern
+        """
+        text = self._code_view
+        n = len(text)
+        m = len(pattern)
+        while k < m:
+            pos = start + k
+            if pos >= n:
+                return k, 1
+            c = text[pos]
+            p = pattern[k]
+            if c != p:
+                return k, 1 if p > c else -1
+            k += 1
+        return k, 0
 
     # -------------------------------
     # Memory usage (bytes)
     # -------------------------------
     def memory_usage(self) -> int:
-        text_bytes = len(self.text.encode("utf-8"))
-        strings_bytes = sum(len(s.encode("utf-8")) for s in self.strings)
+        text_bytes = self.codes.nbytes
+        strings_bytes = sum(len(s.encode("utf-8")) for s in self.strings or ())
+        strings_bytes += sum(
+            len(s.encode("utf-8")) for run in self._delta_runs() for s in run
+        )
         array_bytes = self.suffix_array.nbytes
+        lcp_bytes = (self.lcp.nbytes + self.word_starts.nbytes
+                     + self.start_rank.nbytes + self.word_rank.nbytes
+                     + self.word_order.nbytes)
+        rmq_bytes = self._rmq.nbytes if self._rmq is not None else 0
+        tombstone_bytes = len(self._dead)
+
+        return (text_bytes + strings_bytes + array_bytes + lcp_bytes
+                + rmq_bytes + tombstone_bytes)
 
-        return text_bytes + strings_bytes + array_bytes
+    def memory_report(self) -> dict:
+        """
+        Real bytes per component: NumPy buffers by nbytes, and the Python
+        word store, id map, tombstones and delta segments by getsizeof
+        (word_ids shares its key strings with strings).
+        """
+        counter = MemoryCounter()
+        counter.add_arrays("text", self.codes)
+        counter.add_arrays("suffix_array", self.suffix_array)
+        counter.add_arrays("lcp", self.lcp)
+        if self._rmq is not None:
+            counter.add_arrays("rmq", *self._rmq.levels)
+        counter.add_arrays("word_index", self.word_starts, self.start_rank,
+                           self.word_rank, self.word_order)
+        if self.strings is not None:
+            counter.add_objects("word_store", [self.strings])
+            counter.add_objects("word_store", self.strings)
+            counter.add_objects("word_ids", [self.word_ids])
+            counter.add_objects("word_ids", self.word_ids.values())
+        counter.add_objects("tombstones", [self._dead, self._dead_ranks])
+        counter.add_objects("tombstones", self._dead_ranks)
+        counter.add_objects("deltas", [self.memtable, self.delta_segments])
+        counter.add_objects("deltas", self.delta_segments)
+        counter.add_objects("deltas", (w for run in self._delta_runs() for w in run))
+        counter.add_objects("alphabet", [self.alphabet, self._char_codes])
+        return counter.report()
 
 
     # -------------------------------
@@ -141,9 +739,111 @@ class InvertedSuffixArray:
         
         Time Complexity: O(n log n) instead of O(n² log n)
         """
+        self._load_word_store()
         for word in words:
             inverted = self.invert_string(word)
-            self.strings.append(inverted)  # Store inverted string (not original)
-        
+            if inverted not in self.word_ids:
+                self._append_word(inverted)  # Store inverted string (not original)
+
+        # Pending delta segments are folded in by the same rebuild
+        self._drain_deltas()
+
         # Only rebuild ONCE after all insertions
         self._rebuild_suffix_array()
+
+    # -------------------------------
+    # Persistence (versioned binary files, memory-mapped loading)
+    # -------------------------------
+    def save(self, path: str) -> None:
+        """
+        Write the index to a directory: one .npy file per array (text
+        codes, suffix array, LCP, word starts, tombstones) and meta.json
+        with the format version, alphabet and constructor parameters.
+        Buffered delta segments are folded into the main array first.
+
+        meta.json is written last, so an interrupted save is never loadable.
+        """
+        self.merge_segments()
+        os.makedirs(path, exist_ok=True)
+
+        arrays = {
+            "codes": self.codes,
+            "suffix_array": self.suffix_array,
+            "lcp": self.lcp,
+            "word_starts": self.word_starts,
+            "start_rank": self.start_rank,
+            "word_rank": self.word_rank,
+            "word_order": self.word_order,
+            "dead": np.frombuffer(bytes(self._dead), dtype=np.uint8),
+        }
+        for name in INDEX_ARRAYS:
+            np.save(os.path.join(path, f"{name}.npy"), arrays[name])
+
+        meta = {
+            "format": INDEX_FORMAT,
+            "version": INDEX_VERSION,
+            "alphabet": self.alphabet,
+            "words": len(self.word_starts) - 1,
+            "dead_count": self.dead_count,
+            "params": {
+                "algorithm": self.algorithm,
+                "use_rmq": self.use_rmq,
+                "mutable": self.mutable,
+                "delta_threshold": self.delta_threshold,
+                "merge_ratio": self.merge_ratio,
+                "compaction_threshold": self.compaction_threshold,
+                "workers": self.workers,
+            },
+        }
+        with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=4)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "InvertedSuffixArray":
+        """
+        Load an index written by save(). With mmap=True the arrays are
+        opened as read-only np.memmap views, so loading does no copying and
+        processes loading the same index share the OS page cache. Result
+        words are decoded from the code buffer on demand; the Python word
+        store is only built by the first insert or delete, and later
+        rebuilds replace the arrays with in-memory ones.
+        """
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format") != INDEX_FORMAT:
+            raise ValueError(f"{path} is not an {INDEX_FORMAT} index")
+        if meta.get("version") != INDEX_VERSION:
+            raise ValueError(
+                f"Unsupported index version {meta.get('version')} "
+                f"(expected {INDEX_VERSION})"
+            )
+
+        mmap_mode = "r" if mmap else None
+        arrays = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)
+            for name in INDEX_ARRAYS
+        }
+
+        index = cls(**meta["params"])
+        index.codes = arrays["codes"]
+        index._code_view = memoryview(index.codes)
+        index.suffix_array = arrays["suffix_array"]
+        index.lcp = arrays["lcp"]
+        index.word_starts = arrays["word_starts"]
+        index.start_rank = arrays["start_rank"]
+        index.word_rank = arrays["word_rank"]
+        index.word_order = arrays["word_order"]
+        index._rmq = LcpRmq(index.lcp) if index.use_rmq else None
+        index.alphabet = meta["alphabet"]
+        index._char_codes = {ch: i + 1 for i, ch in enumerate(index.alphabet)}
+
+        # Word store left unloaded (see _load_word_store)
+        index.strings = None
+        index.word_ids = None
+        index._decode_table = decode_table(index.alphabet)
+        index._dead = bytearray(arrays["dead"].tobytes())
+        index.dead_count = meta["dead_count"]
+        dead_ids = np.flatnonzero(arrays["dead"])
+        index._dead_ranks = sorted(index.word_rank[dead_ids].tolist())
+
+        return index
@@ -76,15 +76,9 @@ def export_suffix_array_to_txt(sa_object, filename="suffix_array.txt", limit=Non
         f.write("-" * 80 + "\n")
         
         for i, idx in enumerate(entries):
-            inv_suffix = sa_object.text[idx:idx+30]
-            
-            # Extract original word by splitting at delimiter
-            end = len(inv_suffix)
-            for j, ch in enumerate(inv_suffix):
-                if ord(ch) >= 0xE000:
-                    end = j
-                    break
-            original = inv_suffix[:end][::-1]  # reverse back
+            # Suffix up to the end of its word
+            inv_suffix = sa_object.suffix(idx)[:30]
+            original = inv_suffix[::-1]  # reverse back
             
             f.write(f"{i:<8} | {inv_suffix:<30} | {original}\n")
         
@@ -162,7 +156,7 @@ def visualize_all_graphviz(words, visualize_delete, delete_word, output_dir="./v
         os.makedirs(f'{output_dir}/delete', exist_ok=True)
 
     trie = PrefixTrie()
-    sa = InvertedSuffixArray()
+    sa = InvertedSuffixArray(mutable=True)
 
     print("\n=== INSERT PHASE ===")
     for w in words:
@@ -182,8 +176,9 @@ def visualize_all_graphviz(words, visualize_delete, delete_word, output_dir="./v
     trie_graph.render(f'{output_dir}/complete/prefix_trie', format='png', cleanup=True)
     print(f"Saved: {output_dir}/complete/prefix_trie.png")
     
-    # Export Suffix Array to text file
+    # Export Suffix Array to text file (fold buffered inserts in first)
     print("Exporting Suffix Array to text file...")
+    sa.merge_segments()
     export_suffix_array_to_txt(sa, f'{output_dir}/complete/suffix_array.txt')
     print(f"Saved: {output_dir}/complete/suffix_array.txt")
 
@@ -202,8 +197,10 @@ def visualize_all_graphviz(words, visualize_delete, delete_word, output_dir="./v
         trie_graph_after.render(f'{output_dir}/delete/prefix_trie_after_delete', format='png', cleanup=True)
         print(f"Saved: {output_dir}/delete/prefix_trie_after_delete.png")
         
-        # Export Suffix Array after deletion to text file
+        # Export Suffix Array after deletion to text file (drop the
+        # tombstoned word first, a single delete never triggers compaction)
         print("Exporting Suffix Array (after deletion) to text file...")
+        sa.compact()
         export_suffix_array_to_txt(sa, f'{output_dir}/delete/suffix_array_after_delete.txt')
         print(f"Saved: {output_dir}/delete/suffix_array_after_delete.txt")
 
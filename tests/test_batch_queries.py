@@ -0,0 +1,21 @@
+import pytest
+
+from fm_index import FMIndex
+from prefix_trie import PrefixTrie, RadixTrie
+from sorted_word_array import SortedWordArray
+from suffix_array import InvertedSuffixArray
+
+WORDS = ["testing", "running", "sing", "ring", "apple", "maple", "a"]
+
+
+# Batches of only empty patterns or characters outside the alphabet
+# (width-0 pattern matrices in the suffix array's lock-step search)
+@pytest.mark.parametrize("batch", [[""], ["\x00\x00"], ["\x00", ""], ["\x00", "sing"]])
+@pytest.mark.parametrize(
+    "structure_class", [InvertedSuffixArray, PrefixTrie, RadixTrie, FMIndex, SortedWordArray]
+)
+def test_batch_queries_match_single_queries(structure_class, batch):
+    structure = structure_class()
+    structure.insert_batch(WORDS)
+    assert structure.search_many(batch) == [structure.search(q) for q in batch]
+    assert structure.range_search_many(batch) == [structure.range_search(q) for q in batch]